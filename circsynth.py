@@ -121,6 +121,8 @@ Examples:
   python circsynth.py --example full_adder   # Run full adder synthesis
   python circsynth.py --example all          # Run all examples
   python circsynth.py --interactive          # Interactive mode
+  python circsynth.py --serve --port 8765    # Run the local synthesis service
+  python circsynth.py --search-worker host:8766  # Join a distributed exact search
         ''')
 
     parser.add_argument('--example',
@@ -137,12 +139,37 @@ Examples:
     parser.add_argument('--interactive', action='store_true',
         help='Run in interactive mode for custom truth tables')
 
+    parser.add_argument('--serve', action='store_true',
+        help='Run the local synthesis service')
+
+    parser.add_argument('--host', default='127.0.0.1',
+        help='Service bind address (default: 127.0.0.1)')
+
+    parser.add_argument('--port', type=int, default=8765,
+        help='Service TCP port (default: 8765)')
+
+    parser.add_argument('--socket',
+        help='Serve on a Unix socket instead of TCP')
+
+    parser.add_argument('--workers', type=int,
+        help='Number of service worker processes (default: CPU count)')
+
+    parser.add_argument('--search-worker', metavar='HOST:PORT',
+        help='Pull exact search subproblems from a distributed coordinator')
+
     parser.add_argument('--version', action='version',
         version='CircSynth 1.0.0')
 
     args = parser.parse_args()
 
-    if args.interactive:
+    if args.serve:
+        from service import run_server
+        run_server(args.host, args.port, args.socket, args.workers)
+    elif args.search_worker:
+        from service import run_worker
+        host, _, port = args.search_worker.rpartition(':')
+        run_worker(host or '127.0.0.1', int(port))
+    elif args.interactive:
         run_interactive_mode()
     elif args.example:
         run_examples(args)
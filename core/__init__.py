@@ -1,10 +1,12 @@
 from .gate import Gate, GateInstance
 from .circuit import Circuit
 from .truth_table import TruthTable
+from .packed_truth_table import PackedTruthTable
 
 __all__ = [
     "Gate",
     "GateInstance",
     "Circuit",
-    "TruthTable"
+    "TruthTable",
+    "PackedTruthTable"
 ]
@@ -1,25 +1,111 @@
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Sequence, Set, Union
 from .gate import Gate, GateInstance
 
 class Circuit:
-    def __init__(self, input_signals: List[str], output_signals: List[str]):
+    def __init__(self, input_signals: List[str], output_signals: List[str], strash: bool = False):
         self.input_signals = input_signals[:]
         self.output_signals = output_signals[:]
         self.gate_instances: List[GateInstance] = []
         self.all_signals: Set[str] = set(input_signals)
+        self.strash = strash
+        self._strash_table: Dict[Tuple, List[str]] = {}
+        self._constant_signals: Dict[str, int] = {}
+        self._constant_drivers: Dict[int, str] = {}
         self._signal_counter = 0
         self._levels_computed = False
 
-    def add_gate(self, gate_type: Gate, input_sigs: List[str], output_sigs: List[str]) -> None:
+    @property
+    def output_signals(self) -> List[str]:
+        return self._output_signals
+
+    @output_signals.setter
+    def output_signals(self, signals: List[str]) -> None:
+        self._output_signals = signals
+        self._output_set = set(signals)
+
+    def add_gate(self, gate_type: Gate, input_sigs: List[str], output_sigs: Optional[List[str]] = None) -> List[str]:
+        named = output_sigs is not None
+        if output_sigs is None:
+            output_sigs = self.generate_unique_signals(gate_type.output_count)
+
+        if not self.strash:
+            self._append_gate(gate_type, input_sigs, output_sigs)
+            return output_sigs[:]
+
+        drives_output = any(sig in self._output_set for sig in output_sigs)
+        folded = self._fold_gate(gate_type, input_sigs)
+
+        # Gates driving no output are replaced by the existing signals they
+        # fold or hash to. Internal names chosen by the caller would then
+        # never be driven, so such gates are rejected rather than dropped.
+        if not drives_output:
+            shared = None
+            if all(isinstance(result, str) for result in folded):
+                shared = list(folded)
+            else:
+                shared = self._strash_table.get(self._strash_key(gate_type, input_sigs))
+            if shared is not None:
+                if named:
+                    raise ValueError(f"{gate_type.name} gate folds to {', '.join(shared)}; "
+                                     f"cannot name it {', '.join(output_sigs)} in a strashed circuit")
+                return shared[:]
+
+        self._append_gate(gate_type, input_sigs, output_sigs)
+        self._strash_table.setdefault(self._strash_key(gate_type, input_sigs), output_sigs[:])
+        for sig, result in zip(output_sigs, folded):
+            if isinstance(result, int):
+                self._constant_signals[sig] = result
+                self._constant_drivers.setdefault(result, sig)
+        return output_sigs[:]
+
+    def _append_gate(self, gate_type: Gate, input_sigs: List[str], output_sigs: List[str]) -> None:
         gate_instance = GateInstance(gate_type, input_sigs[:], output_sigs[:])
         self.gate_instances.append(gate_instance)
         self.all_signals.update(output_sigs)
         self._levels_computed = False
 
+    def _strash_key(self, gate_type: Gate, input_sigs: List[str]) -> Tuple:
+        if gate_type.is_symmetric():
+            return (gate_type.name, tuple(sorted(input_sigs)))
+        return (gate_type.name, tuple(input_sigs))
+
+    def _fold_gate(self, gate_type: Gate, input_sigs: List[str]) -> List[Union[str, int, None]]:
+        # Re-express the gate over its distinct non-constant inputs; each output
+        # then folds to a constant, to one of those inputs, or to nothing.
+        support = []
+        for sig in input_sigs:
+            if sig not in self._constant_signals and sig not in support:
+                support.append(sig)
+
+        rows = 1 << len(support)
+        mask = (1 << rows) - 1
+        projections = {}
+        for i, sig in enumerate(support):
+            projections[sig] = sum(1 << row for row in range(rows) if (row >> i) & 1)
+
+        input_values = []
+        for sig in input_sigs:
+            if sig in self._constant_signals:
+                input_values.append(mask if self._constant_signals[sig] else 0)
+            else:
+                input_values.append(projections[sig])
+
+        folded: List[Union[str, int, None]] = []
+        for func in gate_type.evaluate_bits(input_values, mask):
+            if func == 0 or func == mask:
+                value = 1 if func else 0
+                folded.append(self._constant_drivers.get(value, value))
+            else:
+                folded.append(next((sig for sig in support if projections[sig] == func), None))
+        return folded
+
     def generate_unique_signals(self, count: int) -> List[str]:
         signals = []
         for _ in range(count):
             signal_name = f"_s{self._signal_counter}"
+            while signal_name in self.all_signals or signal_name in self._output_set:
+                self._signal_counter += 1
+                signal_name = f"_s{self._signal_counter}"
             signals.append(signal_name)
             self._signal_counter += 1
         return signals
@@ -29,29 +115,32 @@ class Circuit:
             return
 
         signal_levels = {sig: 0 for sig in self.input_signals}
+        waiting: Dict[str, List[GateInstance]] = {}
+        pending: Dict[int, int] = {}
+        ready = []
 
-        changed = True
-        while changed:
-            changed = False
-            for gate in self.gate_instances:
-                max_input_level = 0
-                all_inputs_have_level = True
-
-                for input_sig in gate.input_signals:
-                    if input_sig in signal_levels:
-                        max_input_level = max(max_input_level, signal_levels[input_sig])
-                    else:
-                        all_inputs_have_level = False
-                        break
-
-                if all_inputs_have_level:
-                    gate_level = max_input_level + 1
-                    if gate.level != gate_level:
-                        gate.level = gate_level
-                        changed = True
-
-                    for output_sig in gate.output_signals:
-                        signal_levels[output_sig] = gate_level
+        for gate in self.gate_instances:
+            gate.level = 0
+            missing = {sig for sig in gate.input_signals if sig not in signal_levels}
+            if missing:
+                pending[id(gate)] = len(missing)
+                for sig in missing:
+                    waiting.setdefault(sig, []).append(gate)
+            else:
+                ready.append(gate)
+
+        while ready:
+            gate = ready.pop()
+            gate.level = max((signal_levels[sig] for sig in gate.input_signals), default=0) + 1
+
+            for output_sig in gate.output_signals:
+                if output_sig in signal_levels:
+                    continue
+                signal_levels[output_sig] = gate.level
+                for waiter in waiting.pop(output_sig, ()):
+                    pending[id(waiter)] -= 1
+                    if pending[id(waiter)] == 0:
+                        ready.append(waiter)
 
         self._levels_computed = True
 
@@ -96,6 +185,21 @@ class Circuit:
 
         return tuple(result)
 
+    def simulate_bits(self, input_values: Sequence[int], mask: int) -> Dict[str, int]:
+        signal_values = dict(zip(self.input_signals, input_values))
+
+        levels = self.get_gates_by_level()
+        for level in sorted(levels.keys()):
+            for gate_instance in levels[level]:
+                try:
+                    input_vals = [signal_values[sig] for sig in gate_instance.input_signals]
+                except KeyError as e:
+                    raise ValueError(f"Signal {e.args[0]} is not driven") from None
+                output_vals = gate_instance.gate_type.evaluate_bits(input_vals, mask)
+                signal_values.update(zip(gate_instance.output_signals, output_vals))
+
+        return signal_values
+
     def is_functionally_correct(self, target_truth_table: List[Tuple[Tuple[int, ...], Tuple[int, ...]]]) -> bool:
         for input_vals, expected_output_vals in target_truth_table:
             actual_output = self.evaluate(input_vals)
@@ -109,13 +213,52 @@ class Circuit:
     def gate_count(self) -> int:
         return len(self.gate_instances)
 
+    def sweep(self) -> int:
+        drivers = {}
+        for gate in self.gate_instances:
+            for sig in gate.output_signals:
+                drivers[sig] = gate
+
+        live = set()
+        stack = list(self.output_signals)
+        while stack:
+            gate = drivers.get(stack.pop())
+            if gate is None or id(gate) in live:
+                continue
+            live.add(id(gate))
+            stack.extend(gate.input_signals)
+
+        removed = len(self.gate_instances) - len(live)
+        if removed == 0:
+            return 0
+
+        self.gate_instances = [gate for gate in self.gate_instances if id(gate) in live]
+        self.all_signals = set(self.input_signals)
+        for gate in self.gate_instances:
+            self.all_signals.update(gate.output_signals)
+        self._strash_table = {
+            key: sigs for key, sigs in self._strash_table.items()
+            if all(sig in self.all_signals for sig in sigs)
+        }
+        self._constant_signals = {
+            sig: value for sig, value in self._constant_signals.items() if sig in self.all_signals
+        }
+        self._constant_drivers = {}
+        for sig, value in self._constant_signals.items():
+            self._constant_drivers.setdefault(value, sig)
+        self._levels_computed = False
+        return removed
+
     def copy(self) -> 'Circuit':
-        new_circuit = Circuit(self.input_signals[:], self.output_signals[:])
+        new_circuit = Circuit(self.input_signals[:], self.output_signals[:], self.strash)
         new_circuit.gate_instances = [
             GateInstance(gi.gate_type, gi.input_signals[:], gi.output_signals[:], gi.level)
             for gi in self.gate_instances
         ]
         new_circuit.all_signals = self.all_signals.copy()
+        new_circuit._strash_table = self._strash_table.copy()
+        new_circuit._constant_signals = self._constant_signals.copy()
+        new_circuit._constant_drivers = self._constant_drivers.copy()
         new_circuit._signal_counter = self._signal_counter
         return new_circuit
 
@@ -127,6 +270,9 @@ class Circuit:
         dot.append("    node [shape=box];")
 
         levels = self.get_gates_by_level()
+        driven_signals = set(self.input_signals)
+        for gate in self.gate_instances:
+            driven_signals.update(gate.output_signals)
 
         dot.append("    subgraph cluster_inputs {")
         dot.append("        label=\"Inputs\";")
@@ -152,7 +298,7 @@ class Circuit:
                 dot.append(f"        \"{gate_id}\" [label=\"{gate.gate_type.name}\", style=filled, fillcolor=lightyellow];")
 
                 for input_sig in gate.input_signals:
-                    if input_sig in self.input_signals or any(input_sig in g.output_signals for g in self.gate_instances):
+                    if input_sig in driven_signals:
                         dot.append(f"    \"{input_sig}\" -> \"{gate_id}\";")
 
                 for output_sig in gate.output_signals:
@@ -1,4 +1,4 @@
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Sequence
 from dataclasses import dataclass
 
 @dataclass(frozen=True)
@@ -13,6 +13,31 @@ class Gate:
         if len(self.truth_table) != expected_entries:
             raise ValueError(f"Gate {self.name} truth table incomplete: expected {expected_entries}, got {len(self.truth_table)}")
 
+    def evaluate_bits(self, input_values: Sequence[int], mask: int) -> Tuple[int, ...]:
+        outputs = [0] * self.output_count
+        for input_tuple, output_tuple in self.truth_table.items():
+            if not any(output_tuple):
+                continue
+            term = mask
+            for bit, value in zip(input_tuple, input_values):
+                term &= value if bit else ~value
+            for i, out in enumerate(output_tuple):
+                if out:
+                    outputs[i] |= term
+        return tuple(outputs)
+
+    def is_constant(self) -> bool:
+        return len(set(self.truth_table.values())) == 1
+
+    def is_symmetric(self) -> bool:
+        for input_tuple, output_tuple in self.truth_table.items():
+            for i in range(self.input_count - 1):
+                swapped = list(input_tuple)
+                swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+                if self.truth_table[tuple(swapped)] != output_tuple:
+                    return False
+        return True
+
 @dataclass
 class GateInstance:
     gate_type: Gate
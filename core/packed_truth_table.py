@@ -0,0 +1,218 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from itertools import product
+import re
+
+_SMALL_PROJECTIONS = (0xAA, 0xCC, 0xF0)
+_TOKEN_PATTERN = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|([01])|(.))")
+
+class PackedTruthTable:
+    def __init__(self, inputs: List[str], outputs: List[str], columns: Sequence[bytes] = ()):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.row_count = 1 << len(inputs)
+        self.byte_count = max(1, self.row_count // 8)
+        self.mask = (1 << self.row_count) - 1
+
+        if columns:
+            if len(columns) != len(outputs):
+                raise ValueError(f"Expected {len(outputs)} output columns, got {len(columns)}")
+            self.columns = [bytes(col) for col in columns]
+        else:
+            self.columns = [bytes(self.byte_count) for _ in outputs]
+        # Per-output care sets; None means every row is specified.
+        self.care_columns: Optional[List[bytes]] = None
+
+    def column(self, index: int) -> int:
+        return int.from_bytes(self.columns[index], 'little')
+
+    def set_column(self, index: int, value: int) -> None:
+        if value < 0 or value > self.mask:
+            raise ValueError(f"Column value for {self.outputs[index]} exceeds {self.row_count} rows")
+        self.columns[index] = value.to_bytes(self.byte_count, 'little')
+
+    def care(self, index: int) -> int:
+        if self.care_columns is None:
+            return self.mask
+        return int.from_bytes(self.care_columns[index], 'little')
+
+    def set_care(self, index: int, value: int) -> None:
+        if value < 0 or value > self.mask:
+            raise ValueError(f"Care value for {self.outputs[index]} exceeds {self.row_count} rows")
+        if self.care_columns is None:
+            self.care_columns = [self.mask.to_bytes(self.byte_count, 'little') for _ in self.outputs]
+        self.care_columns[index] = value.to_bytes(self.byte_count, 'little')
+
+    def has_dont_cares(self) -> bool:
+        return self.care_columns is not None and any(self.care(i) != self.mask for i in range(len(self.outputs)))
+
+    def care_rows(self) -> int:
+        # Rows where at least one output is specified; the row-list format and
+        # the synthesis engines only model don't-cares at row granularity.
+        if self.care_columns is None:
+            return self.mask
+        rows = 0
+        for i in range(len(self.outputs)):
+            rows |= self.care(i)
+        return rows
+
+    def projection(self, index: int) -> int:
+        return _projection(index, len(self.inputs))
+
+    def evaluate(self, input_values: Tuple[int, ...]) -> Tuple[int, ...]:
+        row = sum(bit << i for i, bit in enumerate(input_values))
+        return tuple((col[row >> 3] >> (row & 7)) & 1 for col in self.columns)
+
+    def to_hex(self) -> List[str]:
+        digits = max(1, self.row_count // 4)
+        return [f"{self.column(i):0{digits}x}" for i in range(len(self.outputs))]
+
+    def to_rows(self) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        input_rows = [combo[::-1] for combo in product((0, 1), repeat=len(self.inputs))]
+        output_bits = [
+            [int(bit) for bit in reversed(bin(self.column(i))[2:].zfill(self.row_count))]
+            for i in range(len(self.outputs))
+        ]
+        rows = list(zip(input_rows, zip(*output_bits)))
+        if self.care_columns is None:
+            return rows
+        care = self.care_rows()
+        return [row for index, row in enumerate(rows) if (care >> index) & 1]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedTruthTable):
+            return NotImplemented
+        return ((self.inputs, self.outputs, self.columns) == (other.inputs, other.outputs, other.columns)
+                and all(self.care(i) == other.care(i) for i in range(len(self.outputs))))
+
+    @staticmethod
+    def from_rows(inputs: List[str], outputs: List[str],
+                  rows: Sequence[Tuple[Tuple[int, ...], Tuple[int, ...]]]) -> 'PackedTruthTable':
+        table = PackedTruthTable(inputs, outputs)
+        if len(rows) != table.row_count:
+            raise ValueError(f"Truth table incomplete: expected {table.row_count} rows, got {len(rows)}")
+
+        columns = [bytearray(table.byte_count) for _ in outputs]
+        for input_vals, output_vals in rows:
+            row = sum(bit << i for i, bit in enumerate(input_vals))
+            for col, val in zip(columns, output_vals):
+                if val:
+                    col[row >> 3] |= 1 << (row & 7)
+
+        table.columns = [bytes(col) for col in columns]
+        return table
+
+    @staticmethod
+    def from_integers(inputs: List[str], outputs: List[str], values: Sequence[int]) -> 'PackedTruthTable':
+        table = PackedTruthTable(inputs, outputs)
+        if len(values) != len(outputs):
+            raise ValueError(f"Expected {len(outputs)} output values, got {len(values)}")
+        for i, value in enumerate(values):
+            table.set_column(i, value)
+        return table
+
+    @staticmethod
+    def from_hex(inputs: List[str], outputs: List[str], values: Sequence[str]) -> 'PackedTruthTable':
+        return PackedTruthTable.from_integers(inputs, outputs, [int(value, 16) for value in values])
+
+    @staticmethod
+    def from_vectorized(inputs: List[str], outputs: List[str], func: Callable) -> 'PackedTruthTable':
+        table = PackedTruthTable(inputs, outputs)
+        projections = {name: table.projection(i) for i, name in enumerate(inputs)}
+
+        values = func(**projections)
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        return PackedTruthTable.from_integers(inputs, outputs, [value & table.mask for value in values])
+
+    @staticmethod
+    def from_expressions(inputs: List[str], outputs: List[str], expressions: Sequence[str]) -> 'PackedTruthTable':
+        table = PackedTruthTable(inputs, outputs)
+        projections = {name: table.projection(i) for i, name in enumerate(inputs)}
+        values = [_ExpressionParser(expr, projections, table.mask).parse() for expr in expressions]
+        return PackedTruthTable.from_integers(inputs, outputs, values)
+
+def _projection(index: int, input_count: int) -> int:
+    row_count = 1 << input_count
+    if index < 3:
+        pattern = bytes([_SMALL_PROJECTIONS[index]])
+    else:
+        half = 1 << (index - 3)
+        pattern = bytes(half) + b'\xff' * half
+    repeat = max(1, row_count // (8 * len(pattern)))
+    value = int.from_bytes(pattern * repeat, 'little')
+    return value & ((1 << row_count) - 1)
+
+class _ExpressionParser:
+    # Precedence from loosest to tightest: |, ^, &, ~
+    def __init__(self, expression: str, variables: Dict[str, int], mask: int):
+        self.expression = expression
+        self.variables = variables
+        self.mask = mask
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    def _tokenize(self, expression: str) -> List[str]:
+        tokens = []
+        for name, constant, symbol in _TOKEN_PATTERN.findall(expression):
+            token = name or constant or symbol
+            if token.strip():
+                tokens.append(token)
+        return tokens
+
+    def _peek(self) -> str:
+        return self.tokens[self.position] if self.position < len(self.tokens) else ""
+
+    def _take(self) -> str:
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> int:
+        value = self._parse_or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected token '{self._peek()}' in expression: {self.expression}")
+        return value
+
+    def _parse_or(self) -> int:
+        value = self._parse_xor()
+        while self._peek() in ('|', '+'):
+            self._take()
+            value |= self._parse_xor()
+        return value
+
+    def _parse_xor(self) -> int:
+        value = self._parse_and()
+        while self._peek() == '^':
+            self._take()
+            value ^= self._parse_and()
+        return value
+
+    def _parse_and(self) -> int:
+        value = self._parse_not()
+        while self._peek() in ('&', '*'):
+            self._take()
+            value &= self._parse_not()
+        return value
+
+    def _parse_not(self) -> int:
+        if self._peek() in ('~', '!'):
+            self._take()
+            return self._parse_not() ^ self.mask
+        return self._parse_atom()
+
+    def _parse_atom(self) -> int:
+        token = self._take()
+        if token == '(':
+            value = self._parse_or()
+            if self._take() != ')':
+                raise ValueError(f"Missing ')' in expression: {self.expression}")
+            return value
+        if token == '0':
+            return 0
+        if token == '1':
+            return self.mask
+        if token in self.variables:
+            return self.variables[token]
+        if not token:
+            raise ValueError(f"Unexpected end of expression: {self.expression}")
+        raise ValueError(f"Unknown input '{token}' in expression: {self.expression}")
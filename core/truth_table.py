@@ -32,17 +32,18 @@ class TruthTable:
     def from_function(inputs: List[str], outputs: List[str], func: Callable) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
         table = TruthTable(inputs, outputs)
         n_inputs = len(inputs)
+        n_outputs = len(outputs)
 
         for i in range(2 ** n_inputs):
-            input_vals = [(i >> j) & 1 for j in range(n_inputs)]
-            input_dict = dict(zip(inputs, input_vals))
+            input_vals = tuple((i >> j) & 1 for j in range(n_inputs))
 
-            output_vals = func(**input_dict)
+            output_vals = func(**dict(zip(inputs, input_vals)))
 
             if not isinstance(output_vals, (list, tuple)):
                 output_vals = [output_vals]
+            if len(output_vals) != n_outputs:
+                raise ValueError(f"Expected {n_outputs} outputs, got {len(output_vals)}")
 
-            output_dict = dict(zip(outputs, output_vals))
-            table.add_row(**input_dict, **output_dict)
+            table.rows.append((input_vals, tuple(output_vals)))
 
         return table.build()
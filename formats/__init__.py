@@ -0,0 +1,12 @@
+from .blif import read_blif, write_blif
+from .aiger import read_aiger, write_aiger
+from .pla import read_pla, write_pla
+
+__all__ = [
+    "read_blif",
+    "write_blif",
+    "read_aiger",
+    "write_aiger",
+    "read_pla",
+    "write_pla"
+]
@@ -0,0 +1,285 @@
+from array import array
+from typing import IO, Dict, List, Tuple
+
+from core import Circuit
+from gates import AND, NOT, gate_function, lut_gate
+from .common import PathOrStream, open_stream
+
+_CHUNK_SIZE = 1 << 16
+
+def read_aiger(source: PathOrStream) -> Circuit:
+    with open_stream(source, 'rb') as stream:
+        reader = _ByteReader(stream)
+        header = reader.read_line().split()
+        if not header or header[0] not in ('aag', 'aig'):
+            raise ValueError("Not an AIGER file")
+        binary = header[0] == 'aig'
+        max_var, input_count, latch_count, output_count, and_count = (int(x) for x in header[1:6])
+        if latch_count or any(int(x) for x in header[6:]):
+            raise ValueError("Sequential AIGER files are not supported")
+
+        builder = _AigerCircuitBuilder(input_count, output_count)
+
+        if binary:
+            input_literals = [2 * (i + 1) for i in range(input_count)]
+        else:
+            input_literals = [int(reader.read_line()) for _ in range(input_count)]
+        builder.set_input_literals(input_literals)
+        builder.set_output_literals([int(reader.read_line().split()[0]) for _ in range(output_count)])
+
+        if binary:
+            lhs = 2 * (input_count + latch_count)
+            for _ in range(and_count):
+                lhs += 2
+                rhs0 = lhs - reader.read_varint()
+                rhs1 = rhs0 - reader.read_varint()
+                builder.add_and(lhs, rhs0, rhs1)
+        else:
+            for _ in range(and_count):
+                lhs, rhs0, rhs1 = (int(x) for x in reader.read_line().split())
+                builder.add_and(lhs, rhs0, rhs1)
+
+        symbols = {}
+        for line in reader.iter_lines():
+            if not line or line[0] == 'c':
+                break
+            position, _, name = line.partition(' ')
+            if position[0] in 'io' and name:
+                symbols[position] = name
+
+    return builder.finish(symbols)
+
+def write_aiger(circuit: Circuit, target: PathOrStream, binary: bool = True) -> None:
+    input_count = len(circuit.input_signals)
+    encoder = _AigEncoder(input_count)
+    literals: Dict[str, int] = {sig: 2 * (i + 1) for i, sig in enumerate(circuit.input_signals)}
+    functions: Dict[Tuple[str, int], int] = {}
+
+    levels = circuit.get_gates_by_level()
+    for level in sorted(levels.keys()):
+        for gate in levels[level]:
+            try:
+                input_literals = [literals[sig] for sig in gate.input_signals]
+            except KeyError as e:
+                raise ValueError(f"Signal {e.args[0]} is not driven") from None
+            gate_type = gate.gate_type
+            for index, output_sig in enumerate(gate.output_signals):
+                key = (gate_type.name, index)
+                if key not in functions:
+                    functions[key] = gate_function(gate_type, index)
+                literals[output_sig] = encoder.build(functions[key], input_literals)
+
+    try:
+        output_literals = [literals[sig] for sig in circuit.output_signals]
+    except KeyError as e:
+        raise ValueError(f"Output {e.args[0]} is not driven") from None
+
+    and_count = len(encoder.ands) // 2
+    max_var = input_count + and_count
+
+    with open_stream(target, 'wb') as stream:
+        tag = 'aig' if binary else 'aag'
+        stream.write(f"{tag} {max_var} {input_count} 0 {len(output_literals)} {and_count}\n".encode())
+        if not binary:
+            stream.write(''.join(f"{2 * (i + 1)}\n" for i in range(input_count)).encode())
+        stream.write(''.join(f"{lit}\n" for lit in output_literals).encode())
+
+        buffer = bytearray()
+        lhs = 2 * input_count
+        ands = encoder.ands
+        for i in range(0, len(ands), 2):
+            lhs += 2
+            rhs0, rhs1 = ands[i], ands[i + 1]
+            if binary:
+                _encode_varint(buffer, lhs - rhs0)
+                _encode_varint(buffer, rhs0 - rhs1)
+            else:
+                buffer += f"{lhs} {rhs0} {rhs1}\n".encode()
+            if len(buffer) >= _CHUNK_SIZE:
+                stream.write(buffer)
+                buffer.clear()
+        stream.write(buffer)
+
+        symbols = [f"i{i} {sig}\n" for i, sig in enumerate(circuit.input_signals)]
+        symbols.extend(f"o{i} {sig}\n" for i, sig in enumerate(circuit.output_signals))
+        stream.write(''.join(symbols).encode())
+
+class _ByteReader:
+    def __init__(self, stream: IO):
+        self.stream = stream
+        self.buffer = b""
+        self.position = 0
+
+    def _fill(self) -> bool:
+        chunk = self.stream.read(_CHUNK_SIZE)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def read_line(self) -> str:
+        while True:
+            end = self.buffer.find(b'\n', self.position)
+            if end >= 0:
+                line = self.buffer[self.position:end]
+                self.position = end + 1
+                return line.decode().strip()
+            if not self._fill():
+                line = self.buffer[self.position:]
+                self.position = len(self.buffer)
+                if not line:
+                    raise ValueError("Unexpected end of AIGER file")
+                return line.decode().strip()
+
+    def read_varint(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            if self.position >= len(self.buffer) and not self._fill():
+                raise ValueError("Unexpected end of AIGER file")
+            byte = self.buffer[self.position]
+            self.position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def iter_lines(self):
+        while True:
+            try:
+                yield self.read_line()
+            except ValueError:
+                return
+
+class _AigerCircuitBuilder:
+    def __init__(self, input_count: int, output_count: int):
+        self.circuit = Circuit([f"i{i}" for i in range(input_count)],
+                               [f"o{i}" for i in range(output_count)])
+        self.var_signals: Dict[int, str] = {}
+        self.inverted_signals: Dict[int, str] = {}
+        self.constant_signals: Dict[int, str] = {}
+        self.output_literals: List[int] = []
+
+    def set_input_literals(self, literals: List[int]) -> None:
+        for i, lit in enumerate(literals):
+            self.var_signals[lit >> 1] = f"i{i}"
+
+    def set_output_literals(self, literals: List[int]) -> None:
+        self.output_literals = literals
+        for i, lit in enumerate(literals):
+            var = lit >> 1
+            if not lit & 1 and var and var not in self.var_signals:
+                self.var_signals[var] = f"o{i}"
+
+    def signal(self, literal: int) -> str:
+        var = literal >> 1
+        if var == 0:
+            return self._constant(literal)
+        if var not in self.var_signals:
+            self.var_signals[var] = f"n{var}"
+        if not literal & 1:
+            return self.var_signals[var]
+        if var not in self.inverted_signals:
+            self.inverted_signals[var] = f"n{var}_inv"
+            self.circuit.add_gate(NOT, [self.var_signals[var]], [self.inverted_signals[var]])
+        return self.inverted_signals[var]
+
+    def _constant(self, literal: int) -> str:
+        if literal not in self.constant_signals:
+            self.constant_signals[literal] = f"const{literal}"
+            self.circuit.add_gate(lut_gate(0, literal), [], [self.constant_signals[literal]])
+        return self.constant_signals[literal]
+
+    def add_and(self, lhs: int, rhs0: int, rhs1: int) -> None:
+        self.circuit.add_gate(AND, [self.signal(rhs0), self.signal(rhs1)], [self.signal(lhs)])
+
+    def finish(self, symbols: Dict[str, str]) -> Circuit:
+        circuit = self.circuit
+        for i, lit in enumerate(self.output_literals):
+            name = f"o{i}"
+            if self.var_signals.get(lit >> 1) == name and not lit & 1:
+                continue
+            if lit >> 1 == 0:
+                circuit.add_gate(lut_gate(0, lit), [], [name])
+            elif lit & 1:
+                circuit.add_gate(NOT, [self.signal(lit ^ 1)], [name])
+            else:
+                source = self.signal(lit)
+                circuit.add_gate(AND, [source, source], [name])
+
+        if symbols:
+            names = dict(symbols)
+            if len(set(names.values())) != len(names):
+                raise ValueError("AIGER symbol table names two signals the same")
+            # Internal names that a symbol claims move to fresh ones.
+            claimed = set(names.values())
+            for sig in circuit.all_signals | set(circuit.output_signals):
+                if sig in claimed and sig not in names:
+                    fresh = circuit.generate_unique_signals(1)[0]
+                    while fresh in claimed:
+                        fresh = circuit.generate_unique_signals(1)[0]
+                    names[sig] = fresh
+            _rename_signals(circuit, names)
+        return circuit
+
+class _AigEncoder:
+    def __init__(self, input_count: int):
+        self.next_var = input_count + 1
+        self.ands = array('I')
+        self.table: Dict[Tuple[int, int], int] = {}
+
+    def make_and(self, a: int, b: int) -> int:
+        if a > b:
+            a, b = b, a
+        if a == 0:
+            return 0
+        if a == 1 or a == b:
+            return b
+        if a ^ b == 1:
+            return 0
+        key = (a, b)
+        literal = self.table.get(key)
+        if literal is None:
+            literal = 2 * self.next_var
+            self.next_var += 1
+            self.ands.append(b)
+            self.ands.append(a)
+            self.table[key] = literal
+        return literal
+
+    def build(self, function: int, input_literals: List[int]) -> int:
+        count = len(input_literals)
+        full = (1 << (1 << count)) - 1
+        if function == 0:
+            return 0
+        if function == full:
+            return 1
+        half = 1 << (count - 1)
+        low = function & ((1 << half) - 1)
+        high = function >> half
+        rest = input_literals[:-1]
+        if low == high:
+            return self.build(low, rest)
+        pivot = input_literals[-1]
+        high_literal = self.build(high, rest)
+        low_literal = self.build(low, rest)
+        return self.make_and(self.make_and(pivot, high_literal) ^ 1,
+                             self.make_and(pivot ^ 1, low_literal) ^ 1) ^ 1
+
+def _encode_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _rename_signals(circuit: Circuit, names: Dict[str, str]) -> None:
+    def rename(signals: List[str]) -> List[str]:
+        return [names.get(sig, sig) for sig in signals]
+
+    circuit.input_signals = rename(circuit.input_signals)
+    circuit.output_signals = rename(circuit.output_signals)
+    for gate in circuit.gate_instances:
+        gate.input_signals = rename(gate.input_signals)
+        gate.output_signals = rename(gate.output_signals)
+    circuit.all_signals = {names.get(sig, sig) for sig in circuit.all_signals}
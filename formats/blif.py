@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional, Tuple
+
+from core import Circuit, Gate
+from gates import ALL_GATES, gate_function, lut_gate
+from .common import PathOrStream, open_stream, iter_statements
+
+def read_blif(source: PathOrStream) -> Circuit:
+    library = {
+        (gate.input_count, gate_function(gate)): gate
+        for gate in ALL_GATES if gate.output_count == 1
+    }
+    circuit = Circuit([], [])
+    cover: Optional[_Cover] = None
+
+    with open_stream(source, 'r') as stream:
+        for tokens in iter_statements(stream):
+            keyword = tokens[0]
+            if not keyword.startswith('.'):
+                if cover is None:
+                    raise ValueError(f"BLIF cube outside of a .names block: {' '.join(tokens)}")
+                cover.add_cube(tokens)
+                continue
+
+            if cover is not None:
+                cover.emit(circuit, library)
+                cover = None
+
+            if keyword == '.names':
+                cover = _Cover(tokens[1:])
+            elif keyword == '.inputs':
+                circuit.input_signals.extend(tokens[1:])
+                circuit.all_signals.update(tokens[1:])
+            elif keyword == '.outputs':
+                circuit.output_signals = circuit.output_signals + tokens[1:]
+            elif keyword == '.model':
+                continue
+            elif keyword in ('.end', '.exdc'):
+                break
+            else:
+                raise ValueError(f"Unsupported BLIF construct {keyword}")
+
+    if cover is not None:
+        cover.emit(circuit, library)
+    return circuit
+
+def write_blif(circuit: Circuit, target: PathOrStream, model_name: str = "circuit") -> None:
+    covers: Dict[Tuple[str, int], str] = {}
+
+    with open_stream(target, 'w') as stream:
+        write = stream.write
+        write(f".model {model_name}\n")
+        write(f".inputs {' '.join(circuit.input_signals)}\n")
+        write(f".outputs {' '.join(circuit.output_signals)}\n")
+
+        for gate in circuit.gate_instances:
+            gate_type = gate.gate_type
+            for index, output_sig in enumerate(gate.output_signals):
+                key = (gate_type.name, index)
+                if key not in covers:
+                    covers[key] = _format_cover(gate_type.input_count, gate_function(gate_type, index))
+                write(f".names {' '.join(gate.input_signals)} {output_sig}\n")
+                write(covers[key])
+
+        write(".end\n")
+
+class _Cover:
+    __slots__ = ('signals', 'input_count', 'function', 'polarity')
+
+    def __init__(self, signals: List[str]):
+        if not signals:
+            raise ValueError(".names without an output signal")
+        self.signals = signals
+        self.input_count = len(signals) - 1
+        self.function = 0
+        self.polarity = None
+
+    def add_cube(self, tokens: List[str]) -> None:
+        if self.input_count == 0:
+            cube, value = "", tokens[0]
+        elif len(tokens) == 2:
+            cube, value = tokens
+        else:
+            raise ValueError(f"Malformed BLIF cube: {' '.join(tokens)}")
+
+        if len(cube) != self.input_count:
+            raise ValueError(f"BLIF cube width mismatch for {self.signals[-1]}: {cube}")
+        if self.polarity is None:
+            self.polarity = value
+        elif value != self.polarity:
+            raise ValueError(f"Mixed ON/OFF-set cover for {self.signals[-1]}")
+
+        reversed_cube = cube[::-1]
+        fixed = int(reversed_cube.replace('-', '0'), 2) if cube else 0
+        free = int(reversed_cube.replace('1', '0').replace('-', '1'), 2) if cube else 0
+
+        subset = free
+        while True:
+            self.function |= 1 << (fixed | subset)
+            if subset == 0:
+                break
+            subset = (subset - 1) & free
+
+    def emit(self, circuit: Circuit, library: Dict[Tuple[int, int], Gate]) -> None:
+        function = self.function
+        if self.polarity == '0':
+            function ^= (1 << (1 << self.input_count)) - 1
+        gate = library.get((self.input_count, function)) or lut_gate(self.input_count, function)
+        circuit.add_gate(gate, self.signals[:-1], self.signals[-1:])
+
+def _format_cover(input_count: int, function: int) -> str:
+    rows = 1 << input_count
+    ones = bin(function).count('1')
+    polarity = 1 if ones * 2 <= rows else 0
+    lines = []
+    for row in range(rows):
+        if (function >> row) & 1 == polarity:
+            cube = ''.join('1' if (row >> i) & 1 else '0' for i in range(input_count))
+            lines.append(f"{cube} {polarity}\n" if cube else f"{polarity}\n")
+    if polarity == 0 and not lines:
+        return "1\n" if input_count == 0 else f"{'-' * input_count} 1\n"
+    return ''.join(lines)
@@ -0,0 +1,32 @@
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Union
+
+PathOrStream = Union[str, os.PathLike, IO]
+
+@contextmanager
+def open_stream(target: PathOrStream, mode: str) -> Iterator[IO]:
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode) as stream:
+            yield stream
+    else:
+        yield target
+
+def iter_statements(stream: IO) -> Iterator[List[str]]:
+    pending = ""
+    for line in stream:
+        comment = line.find('#')
+        if comment >= 0:
+            line = line[:comment]
+        line = line.rstrip()
+        if line.endswith('\\'):
+            pending += line[:-1] + " "
+            continue
+        if pending:
+            line = pending + line
+            pending = ""
+        tokens = line.split()
+        if tokens:
+            yield tokens
+    if pending.strip():
+        yield pending.split()
@@ -0,0 +1,150 @@
+from typing import Iterator, List, Union
+
+from core import TruthTable, PackedTruthTable
+from .common import PathOrStream, open_stream, iter_statements
+
+# Cubes with at most this many free inputs are expanded minterm by minterm;
+# wider ones are built from input projections.
+_ENUMERATION_LIMIT = 6
+
+def read_pla(source: PathOrStream) -> PackedTruthTable:
+    input_count = output_count = None
+    input_names: List[str] = []
+    output_names: List[str] = []
+    pla_type = "fd"
+    on_sets: List[int] = []
+    dc_sets: List[int] = []
+    off_sets: List[int] = []
+    table = None
+
+    with open_stream(source, 'r') as stream:
+        for tokens in iter_statements(stream):
+            keyword = tokens[0]
+            if keyword.startswith('.'):
+                if keyword == '.i':
+                    input_count = int(tokens[1])
+                elif keyword == '.o':
+                    output_count = int(tokens[1])
+                    on_sets = [0] * output_count
+                    dc_sets = [0] * output_count
+                    off_sets = [0] * output_count
+                elif keyword == '.ilb':
+                    input_names = tokens[1:]
+                elif keyword == '.ob':
+                    output_names = tokens[1:]
+                elif keyword == '.type':
+                    pla_type = tokens[1]
+                    if pla_type not in ('f', 'fd', 'fr', 'fdr'):
+                        raise ValueError(f"Unsupported PLA type {pla_type}")
+                elif keyword in ('.e', '.end'):
+                    break
+                elif keyword not in ('.p', '.phase'):
+                    raise ValueError(f"Unsupported PLA directive {keyword}")
+                continue
+
+            if input_count is None or output_count is None:
+                raise ValueError("PLA cube before .i/.o declarations")
+            cube = ''.join(tokens)
+            if len(cube) != input_count + output_count:
+                raise ValueError(f"PLA cube width mismatch: {' '.join(tokens)}")
+            if table is None:
+                table = PackedTruthTable(input_names or [f"x{i}" for i in range(input_count)],
+                                         output_names or [f"y{j}" for j in range(output_count)])
+
+            minterms = None
+            for j, value in enumerate(cube[input_count:]):
+                if value in '14':
+                    target = on_sets
+                elif value in '-2' and 'd' in pla_type:
+                    target = dc_sets
+                elif value in '03' and 'r' in pla_type:
+                    target = off_sets
+                else:
+                    continue
+                if minterms is None:
+                    minterms = _cube_rows(cube[:input_count], table)
+                target[j] |= minterms
+
+    if input_count is None or output_count is None:
+        raise ValueError("PLA file is missing .i/.o declarations")
+
+    if table is None:
+        table = PackedTruthTable(input_names or [f"x{i}" for i in range(input_count)],
+                                 output_names or [f"y{j}" for j in range(output_count)])
+    for j in range(output_count):
+        table.set_column(j, on_sets[j])
+        if 'r' in pla_type:
+            care = on_sets[j] | off_sets[j]
+        else:
+            care = table.mask & ~(dc_sets[j] & ~on_sets[j])
+        if care != table.mask:
+            table.set_care(j, care)
+    return table
+
+def _cube_rows(inputs: str, table: PackedTruthTable) -> int:
+    fixed = free = 0
+    literals = []
+    for i, value in enumerate(inputs):
+        if value == '1':
+            fixed |= 1 << i
+            literals.append((i, True))
+        elif value == '0':
+            literals.append((i, False))
+        elif value in '-2':
+            free |= 1 << i
+        else:
+            raise ValueError(f"Invalid PLA input value '{value}'")
+
+    if bin(free).count("1") > _ENUMERATION_LIMIT:
+        rows = table.mask
+        for i, positive in literals:
+            projection = table.projection(i)
+            rows &= projection if positive else ~projection
+        return rows
+
+    rows = 0
+    subset = free
+    while True:
+        rows |= 1 << (fixed | subset)
+        if subset == 0:
+            return rows
+        subset = (subset - 1) & free
+
+def write_pla(table: Union[TruthTable, PackedTruthTable], target: PathOrStream) -> None:
+    # Rows with every output 0 are left out; the cubes are produced one row
+    # at a time, so only the .p count needs a pass over the table first.
+    if isinstance(table, PackedTruthTable):
+        listed = 0
+        for j in range(len(table.outputs)):
+            listed |= table.column(j) | (table.mask & ~table.care(j))
+        cube_count = bin(listed).count("1")
+        cubes = _packed_cubes(table)
+    else:
+        cube_count = sum(1 for _, outputs in table.rows if any(outputs))
+        cubes = (f"{''.join(map(str, inputs))} {''.join(map(str, outputs))}\n"
+                 for inputs, outputs in table.rows if any(outputs))
+
+    with open_stream(target, 'w') as stream:
+        write = stream.write
+        write(f".i {len(table.inputs)}\n")
+        write(f".o {len(table.outputs)}\n")
+        write(f".ilb {' '.join(table.inputs)}\n")
+        write(f".ob {' '.join(table.outputs)}\n")
+        write(".type fd\n")
+        write(f".p {cube_count}\n")
+        for cube in cubes:
+            write(cube)
+        write(".e\n")
+
+def _packed_cubes(table: PackedTruthTable) -> Iterator[str]:
+    columns = table.columns
+    cares = table.care_columns or [None] * len(columns)
+    input_count = len(table.inputs)
+    for row in range(table.row_count):
+        byte, bit = row >> 3, row & 7
+        values = ''.join('1' if (column[byte] >> bit) & 1
+                         else '0' if care is None or (care[byte] >> bit) & 1 else '-'
+                         for column, care in zip(columns, cares))
+        if values.strip('0'):
+            inputs = ''.join(str((row >> i) & 1) for i in range(input_count))
+            yield f"{inputs} {values}\n"
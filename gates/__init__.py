@@ -1,4 +1,5 @@
 from .standard import *
+from .lut import gate_function, lut_gate, compile_gate
 
 CONSTANT_GATES = [OFF, ON]
 BASIC_GATES = [NOT, AND, OR, XOR]
@@ -15,5 +16,6 @@ __all__ = [
     "OFF", "ON", "NOT", "AND", "OR", "XOR", "NAND", "NOR", "XNOR",
     "AND3", "OR3", "NAND3", "NOR3", "XOR3", "XNOR3", "MAJ3",
     "CONSTANT_GATES", "BASIC_GATES", "EXTENDED_GATES", "THREE_INPUT_GATES",
-    "MINIMAL_SET", "STANDARD_SET", "EXTENDED_SET", "COMPLETE_SET", "ALL_GATES"
+    "MINIMAL_SET", "STANDARD_SET", "EXTENDED_SET", "COMPLETE_SET", "ALL_GATES",
+    "gate_function", "lut_gate", "compile_gate"
 ]
@@ -0,0 +1,43 @@
+from typing import Callable, Dict, Tuple
+
+from core.gate import Gate
+
+_LUT_GATES: Dict[Tuple[int, int], Gate] = {}
+
+def gate_function(gate: Gate, output_index: int = 0) -> int:
+    function = 0
+    for input_tuple, output_tuple in gate.truth_table.items():
+        if output_tuple[output_index]:
+            function |= 1 << sum(bit << i for i, bit in enumerate(input_tuple))
+    return function
+
+def lut_gate(input_count: int, function: int) -> Gate:
+    key = (input_count, function)
+    gate = _LUT_GATES.get(key)
+    if gate is None:
+        digits = max(1, (1 << input_count) // 4)
+        truth_table = {
+            tuple((row >> i) & 1 for i in range(input_count)): ((function >> row) & 1,)
+            for row in range(1 << input_count)
+        }
+        gate = Gate(f"LUT{input_count}_{function:0{digits}X}", input_count, 1, truth_table)
+        _LUT_GATES[key] = gate
+    return gate
+
+def compile_gate(gate: Gate, output_index: int = 0) -> Callable[..., int]:
+    function = gate_function(gate, output_index)
+    rows = 1 << gate.input_count
+    names = [f"x{i}" for i in range(gate.input_count)]
+
+    on_rows = [row for row in range(rows) if (function >> row) & 1]
+    inverted = len(on_rows) * 2 > rows
+    term_rows = [row for row in range(rows) if not (function >> row) & 1] if inverted else on_rows
+
+    terms = []
+    for row in term_rows:
+        literals = [name if (row >> i) & 1 else f"({name} ^ m)" for i, name in enumerate(names)]
+        terms.append(" & ".join(literals) if literals else "m")
+    body = " | ".join(f"({term})" for term in terms) if terms else "0"
+    if inverted:
+        body = f"({body}) ^ m"
+    return eval(f"lambda {', '.join(names + ['m'])}: {body}")
@@ -0,0 +1,14 @@
+from .server import SynthesisService, create_server, run_server, DEFAULT_PORT
+from .client import SynthesisClient
+from .distributed import DistributedExactSynthesis, run_worker, DEFAULT_DISTRIBUTED_PORT
+
+__all__ = [
+    "SynthesisService",
+    "SynthesisClient",
+    "create_server",
+    "run_server",
+    "DEFAULT_PORT",
+    "DistributedExactSynthesis",
+    "run_worker",
+    "DEFAULT_DISTRIBUTED_PORT"
+]
@@ -0,0 +1,102 @@
+from http.client import HTTPConnection
+from typing import Dict, List, Optional, Sequence, Union
+import json
+import socket
+import time
+
+from core import Circuit, Gate, PackedTruthTable
+from .protocol import gate_to_spec, table_to_spec, circuit_from_spec
+from .server import DEFAULT_PORT, DONE, FAILED, CANCELLED
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+class SynthesisClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 unix_socket: Optional[str] = None, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+        self._job_gates: Dict[str, Dict[str, Gate]] = {}
+
+    def submit(self,
+               target_truth_table: Union[PackedTruthTable, Sequence],
+               input_names: List[str],
+               output_names: List[str],
+               available_gates: List[Gate],
+               max_gates: int = 15,
+               priority: int = 0) -> str:
+        request = {
+            "inputs": input_names,
+            "outputs": output_names,
+            "columns": table_to_spec(target_truth_table, input_names, output_names),
+            "gates": [gate_to_spec(gate) for gate in available_gates],
+            "max_gates": max_gates,
+            "priority": priority
+        }
+        response = self._request("POST", "/jobs", request)
+        self._job_gates[response["id"]] = {gate.name: gate for gate in available_gates}
+        return response["id"]
+
+    def status(self, job_id: str, wait: float = 0.0) -> dict:
+        return self._request("GET", f"/jobs/{job_id}?wait={wait}")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def stats(self) -> dict:
+        return self._request("GET", "/stats")
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Optional[Circuit]:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = 30.0 if deadline is None else max(0.0, min(30.0, deadline - time.time()))
+            response = self.status(job_id, wait)
+            if response["status"] == DONE:
+                return circuit_from_spec(response["result"], self._job_gates.get(job_id, {}))
+            if response["status"] == FAILED:
+                raise RuntimeError(f"Synthesis job {job_id} failed: {response.get('error')}")
+            if response["status"] == CANCELLED:
+                return None
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError(f"Synthesis job {job_id} still {response['status']}")
+
+    def synthesize(self,
+                   target_truth_table: Union[PackedTruthTable, Sequence],
+                   input_names: List[str],
+                   output_names: List[str],
+                   available_gates: List[Gate],
+                   max_gates: int = 15,
+                   priority: int = 0,
+                   timeout: Optional[float] = None) -> Optional[Circuit]:
+        job_id = self.submit(target_truth_table, input_names, output_names, available_gates, max_gates, priority)
+        return self.result(job_id, timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        if self.unix_socket is not None:
+            connection = _UnixHTTPConnection(self.unix_socket, self.timeout)
+        else:
+            connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = None if payload is None else json.dumps(payload)
+            headers = {} if body is None else {"Content-Type": "application/json"}
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+        if response.status == 404:
+            raise KeyError(data.get("error", path))
+        if response.status >= 400:
+            raise ValueError(data.get("error", f"HTTP {response.status}"))
+        return data
@@ -0,0 +1,378 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import itertools
+import json
+import multiprocessing
+import socket
+import socketserver
+import threading
+import time
+import uuid
+
+from core import Circuit, Gate, PackedTruthTable
+from synthesis import ExactCircuitSynthesis
+from synthesis.targets import TargetTable
+from .protocol import gate_from_spec, gate_to_spec, table_to_spec, circuit_to_spec, circuit_from_spec
+
+DEFAULT_DISTRIBUTED_PORT = 8766
+
+SearchNode = Tuple[Circuit, Dict[str, int], int]
+
+class DistributedExactSynthesis:
+    def __init__(self,
+                 available_gates: List[Gate],
+                 max_gates: int = 15,
+                 host: str = "127.0.0.1",
+                 port: int = DEFAULT_DISTRIBUTED_PORT,
+                 local_workers: int = 0,
+                 initial_subproblems: int = 64,
+                 heartbeat: float = 0.25,
+                 verbose: bool = True):
+        self.available_gates = available_gates
+        self.max_gates = max_gates
+        self.host = host
+        self.port = port
+        self.local_workers = local_workers
+        self.initial_subproblems = initial_subproblems
+        self.heartbeat = heartbeat
+        self.verbose = verbose
+        self._lock = threading.Condition()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._processes: List[multiprocessing.Process] = []
+        self._connection_ids = itertools.count()
+        self._job: Optional[dict] = None
+        self._round = 0
+        self._pool: Deque[dict] = deque()
+        self._outstanding: Dict[int, dict] = {}
+        self._idle: set = set()
+        self._busy: set = set()
+        self._seen_jobs: Dict[int, str] = {}
+        self._solution: Optional[dict] = None
+        self._nodes_explored = 0
+        self._handed_off = 0
+        self._stopped = False
+
+    def __enter__(self) -> 'DistributedExactSynthesis':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> 'DistributedExactSynthesis':
+        if self._server is not None:
+            return self
+        self._stopped = False
+        self._server = _CoordinatorServer((self.host, self.port), _CoordinatorHandler)
+        self._server.coordinator = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="distributed-coordinator", daemon=True).start()
+
+        # The coordinator thread is already running, so workers are not forked
+        # from this process.
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        for _ in range(self.local_workers):
+            process = context.Process(target=run_worker, args=(self.host, self.port, False, 30.0, self.heartbeat),
+                                      daemon=True)
+            process.start()
+            self._processes.append(process)
+        self._log(f"Coordinator listening on {self.host}:{self.port} with {self.local_workers} local workers")
+        return self
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        with self._lock:
+            self._stopped = True
+            self._job = None
+            self._lock.notify_all()
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def synthesize(self,
+                   target_truth_table: TargetTable,
+                   input_names: List[str],
+                   output_names: List[str]) -> Optional[Circuit]:
+        self.start()
+        engine = ExactCircuitSynthesis(self.available_gates, self.max_gates, verbose=False)
+        engine._prepare_search(target_truth_table, input_names, output_names)
+        root, signal_functions, output_targets, mask = engine._initial_state(
+            target_truth_table, input_names, output_names
+        )
+        job = {
+            "id": uuid.uuid4().hex,
+            "inputs": input_names,
+            "outputs": output_names,
+            "columns": table_to_spec(target_truth_table, input_names, output_names),
+            "gates": [gate_to_spec(gate) for gate in self.available_gates]
+        }
+
+        self._log(f"Starting distributed synthesis: {len(input_names)} inputs -> {len(output_names)} outputs")
+        with self._lock:
+            self._nodes_explored = 0
+            self._handed_off = 0
+        total_start_time = time.time()
+        gates = {gate.name: gate for gate in self.available_gates}
+
+        try:
+            for gate_limit in range(1, self.max_gates + 1):
+                start_time = time.time()
+                frontier, solution = self._split_root(engine, root, signal_functions, output_targets, mask, gate_limit)
+
+                if solution is None and frontier:
+                    with self._lock:
+                        self._job = job
+                        self._round = gate_limit
+                        self._pool = deque(_node_to_spec(node) for node in frontier)
+                        self._outstanding = {}
+                        self._solution = None
+                        self._lock.notify_all()
+                        while self._solution is None and (self._pool or self._outstanding):
+                            self._lock.wait(1.0)
+                        self._round = 0
+                        if self._solution is not None:
+                            solution = circuit_from_spec(self._solution, gates)
+
+                elapsed_time = time.time() - start_time
+                if solution is not None:
+                    self._log(f"Trying {gate_limit} gates... Found solution! (time: {elapsed_time:.3f}s, "
+                              f"{len(frontier)} initial subproblems)")
+                    self._log(f"Total time: {time.time() - total_start_time:.3f}s, "
+                              f"{self._nodes_explored} nodes explored by workers, "
+                              f"{self._handed_off} subproblems handed off")
+                    return solution
+                self._log(f"Trying {gate_limit} gates... No solution (time: {elapsed_time:.3f}s)")
+        finally:
+            with self._lock:
+                self._job = None
+                self._pool.clear()
+                self._outstanding = {}
+                self._lock.notify_all()
+
+        self._log(f"No solution found within {self.max_gates} gates limit")
+        return None
+
+    def _split_root(self, engine: ExactCircuitSynthesis, root: Circuit, signal_functions: Dict[str, int],
+                    output_targets: Dict[str, int], mask: int, gate_limit: int) -> Tuple[List[SearchNode], Optional[Circuit]]:
+        # Breadth-first expansion until there is enough work to hand out.
+        frontier: List[SearchNode] = [(root, signal_functions, gate_limit)]
+        while frontier and len(frontier) < self.initial_subproblems:
+            expanded = []
+            for circuit, functions, remaining in frontier:
+                if circuit.has_all_outputs_connected():
+                    return [], circuit
+                for child, child_functions in engine._iter_children(circuit, functions, output_targets, mask, remaining):
+                    expanded.append((child, child_functions, remaining - 1))
+            if not expanded:
+                return [], None
+            if all(remaining == 0 for _, _, remaining in expanded):
+                break
+            frontier = expanded
+        for circuit, _, _ in frontier:
+            if circuit.has_all_outputs_connected():
+                return [], circuit
+        return frontier, None
+
+    def _handle(self, connection_id: int, message: dict) -> dict:
+        with self._lock:
+            kind = message.get("type")
+            if kind == "request":
+                return self._assign(connection_id)
+            if kind == "progress":
+                return {"action": self._progress_action(message)}
+            if kind == "donate":
+                if self._is_current(message):
+                    self._pool.extend(message["subproblems"])
+                    self._handed_off += len(message["subproblems"])
+                    self._lock.notify_all()
+                return {"action": "continue"}
+            if kind == "result":
+                self._busy.discard(connection_id)
+                # Late results of an earlier job do not count towards this one.
+                if self._job is not None and message.get("job") == self._job["id"]:
+                    self._nodes_explored += int(message.get("nodes", 0))
+                if self._is_current(message):
+                    self._outstanding.pop(connection_id, None)
+                    if message.get("solution") is not None and self._solution is None:
+                        self._solution = message["solution"]
+                    self._lock.notify_all()
+                return {"type": "ack"}
+            return {"type": "error", "error": f"unknown message type {kind}"}
+
+    def _assign(self, connection_id: int) -> dict:
+        if self._stopped:
+            return {"type": "shutdown"}
+        if self._job is None or self._round == 0 or self._solution is not None or not self._pool:
+            if self._job is not None and self._outstanding:
+                self._idle.add(connection_id)
+            return {"type": "wait", "seconds": 0.05}
+
+        self._idle.discard(connection_id)
+        subproblem = self._pool.popleft()
+        self._outstanding[connection_id] = subproblem
+        self._busy.add(connection_id)
+        reply = {"type": "work", "job": self._job["id"], "round": self._round, "subproblem": subproblem}
+        if self._seen_jobs.get(connection_id) != self._job["id"]:
+            reply["context"] = self._job
+            self._seen_jobs[connection_id] = self._job["id"]
+        return reply
+
+    def _progress_action(self, message: dict) -> str:
+        if self._stopped or not self._is_current(message) or self._solution is not None:
+            return "abort"
+        # Work stealing: an idle worker and an empty pool make the next busy
+        # worker give away the shallow half of its search stack.
+        if self._idle and not self._pool and message.get("can_split"):
+            self._idle.clear()
+            return "split"
+        return "continue"
+
+    def _is_current(self, message: dict) -> bool:
+        return (self._job is not None and message.get("job") == self._job["id"]
+                and message.get("round") == self._round)
+
+    def _disconnected(self, connection_id: int) -> None:
+        with self._lock:
+            subproblem = self._outstanding.pop(connection_id, None)
+            if subproblem is not None:
+                self._pool.appendleft(subproblem)
+            self._idle.discard(connection_id)
+            self._busy.discard(connection_id)
+            self._seen_jobs.pop(connection_id, None)
+            self._lock.notify_all()
+
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        connection_id = next(coordinator._connection_ids)
+        try:
+            for line in self.rfile:
+                reply = coordinator._handle(connection_id, json.loads(line))
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                self.wfile.flush()
+                if reply.get("type") == "shutdown":
+                    break
+        except (OSError, ValueError):
+            pass
+        finally:
+            coordinator._disconnected(connection_id)
+
+def _node_to_spec(node: SearchNode) -> dict:
+    circuit, _, remaining = node
+    return {"gates": circuit_to_spec(circuit)["gates"], "remaining": remaining}
+
+class _WorkerSearch:
+    def __init__(self, context: dict):
+        self.gates = {}
+        for spec in context["gates"]:
+            gate = gate_from_spec(spec)
+            self.gates[gate.name] = gate
+        self.input_names = context["inputs"]
+        self.output_names = context["outputs"]
+        table = PackedTruthTable.from_hex(self.input_names, self.output_names, context["columns"])
+        self.engine = ExactCircuitSynthesis(list(self.gates.values()), verbose=False)
+        self.engine._prepare_search(table, self.input_names, self.output_names)
+        _, self.input_functions, self.output_targets, self.mask = self.engine._initial_state(
+            table, self.input_names, self.output_names
+        )
+
+    def node_from_spec(self, spec: dict) -> SearchNode:
+        circuit = Circuit(self.input_names, self.output_names)
+        signal_functions = dict(self.input_functions)
+        for gate in spec["gates"]:
+            gate_type = self.gates[gate["type"]]
+            circuit.add_gate(gate_type, gate["inputs"], gate["outputs"])
+            values = gate_type.evaluate_bits([signal_functions[sig] for sig in gate["inputs"]], self.mask)
+            signal_functions.update(zip(gate["outputs"], values))
+        return circuit, signal_functions, spec["remaining"]
+
+def run_worker(host: str = "127.0.0.1",
+               port: int = DEFAULT_DISTRIBUTED_PORT,
+               verbose: bool = True,
+               connect_timeout: float = 30.0,
+               heartbeat: float = 0.25) -> None:
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError:
+            if time.time() >= deadline:
+                raise
+            time.sleep(0.1)
+
+    stream = sock.makefile('rwb')
+    searches: Dict[str, _WorkerSearch] = {}
+
+    def exchange(message: dict) -> dict:
+        stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("coordinator closed the connection")
+        return json.loads(line)
+
+    if verbose:
+        print(f"Worker connected to {host}:{port}")
+    try:
+        while True:
+            reply = exchange({"type": "request"})
+            if reply["type"] == "shutdown":
+                return
+            if reply["type"] == "wait":
+                time.sleep(reply.get("seconds", 0.05))
+                continue
+
+            if "context" in reply:
+                searches = {reply["job"]: _WorkerSearch(reply["context"])}
+            search = searches[reply["job"]]
+            tag = {"job": reply["job"], "round": reply["round"]}
+            solution, nodes = _explore(search, search.node_from_spec(reply["subproblem"]), exchange, tag, heartbeat)
+            exchange(dict(tag, type="result", solution=circuit_to_spec(solution), nodes=nodes))
+    except (ConnectionError, OSError):
+        return
+    finally:
+        stream.close()
+        sock.close()
+
+def _explore(search: _WorkerSearch, node: SearchNode, exchange, tag: dict,
+             heartbeat: float) -> Tuple[Optional[Circuit], int]:
+    engine = search.engine
+    stack = [node]
+    nodes = 0
+    next_heartbeat = time.time() + heartbeat
+
+    while stack:
+        circuit, signal_functions, remaining = stack.pop()
+        nodes += 1
+        if circuit.has_all_outputs_connected():
+            return circuit, nodes
+
+        children = list(engine._iter_children(circuit, signal_functions, search.output_targets, search.mask, remaining))
+        stack.extend((child, functions, remaining - 1) for child, functions in reversed(children))
+
+        if time.time() >= next_heartbeat:
+            action = exchange(dict(tag, type="progress", can_split=len(stack) > 1))["action"]
+            if action == "abort":
+                return None, nodes
+            if action == "split":
+                # The bottom of the stack holds the shallowest, largest subtrees.
+                donated, stack = stack[:len(stack) // 2], stack[len(stack) // 2:]
+                exchange(dict(tag, type="donate", subproblems=[_node_to_spec(entry) for entry in donated]))
+            next_heartbeat = time.time() + heartbeat
+
+    return None, nodes
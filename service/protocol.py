@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional, Sequence, Union
+import hashlib
+import json
+
+from core import Circuit, Gate, PackedTruthTable
+from gates import ALL_GATES, gate_function
+
+STANDARD_GATES = {gate.name: gate for gate in ALL_GATES}
+
+def gate_to_spec(gate: Gate) -> dict:
+    return {
+        "name": gate.name,
+        "input_count": gate.input_count,
+        "output_count": gate.output_count,
+        "functions": [f"{gate_function(gate, i):x}" for i in range(gate.output_count)]
+    }
+
+def gate_from_spec(spec: Union[str, dict]) -> Gate:
+    if isinstance(spec, str):
+        if spec not in STANDARD_GATES:
+            raise ValueError(f"Unknown gate {spec}")
+        return STANDARD_GATES[spec]
+
+    input_count = int(spec["input_count"])
+    functions = [int(value, 16) for value in spec["functions"]]
+    truth_table = {
+        tuple((row >> i) & 1 for i in range(input_count)): tuple((func >> row) & 1 for func in functions)
+        for row in range(1 << input_count)
+    }
+    return Gate(spec["name"], input_count, int(spec.get("output_count", len(functions))), truth_table)
+
+def table_to_spec(table: Union[PackedTruthTable, Sequence], input_names: List[str], output_names: List[str]) -> List[str]:
+    if not isinstance(table, PackedTruthTable):
+        table = PackedTruthTable.from_rows(input_names, output_names, table)
+    if table.has_dont_cares():
+        raise ValueError("Targets with don't-care rows cannot be sent to the synthesis service")
+    return table.to_hex()
+
+def circuit_to_spec(circuit: Optional[Circuit]) -> Optional[dict]:
+    if circuit is None:
+        return None
+    return {
+        "inputs": circuit.input_signals,
+        "outputs": circuit.output_signals,
+        "gates": [
+            {"type": gate.gate_type.name, "inputs": gate.input_signals, "outputs": gate.output_signals}
+            for gate in circuit.gate_instances
+        ]
+    }
+
+def circuit_from_spec(spec: Optional[dict], gates: Dict[str, Gate]) -> Optional[Circuit]:
+    if spec is None:
+        return None
+    circuit = Circuit(spec["inputs"], spec["outputs"])
+    for gate in spec["gates"]:
+        gate_type = gates.get(gate["type"]) or STANDARD_GATES[gate["type"]]
+        circuit.add_gate(gate_type, gate["inputs"], gate["outputs"])
+    return circuit
+
+def rename_circuit_spec(spec: Optional[dict], input_names: List[str], output_names: List[str]) -> Optional[dict]:
+    if spec is None:
+        return None
+    names = dict(zip(spec["inputs"], input_names))
+    names.update(zip(spec["outputs"], output_names))
+    # Internal signals get fresh names that avoid the caller's signal names.
+    used = set(input_names) | set(output_names)
+    counter = 0
+    for gate in spec["gates"]:
+        for sig in gate["outputs"]:
+            if sig in names:
+                continue
+            while f"_s{counter}" in used:
+                counter += 1
+            names[sig] = f"_s{counter}"
+            used.add(names[sig])
+    return {
+        "inputs": input_names[:],
+        "outputs": output_names[:],
+        "gates": [
+            {
+                "type": gate["type"],
+                "inputs": [names.get(sig, sig) for sig in gate["inputs"]],
+                "outputs": [names.get(sig, sig) for sig in gate["outputs"]]
+            }
+            for gate in spec["gates"]
+        ]
+    }
+
+def target_key(input_count: int, columns: List[str], gate_specs: List[dict]) -> str:
+    canonical = json.dumps(
+        {"inputs": input_count, "columns": [f"{int(col, 16):x}" for col in columns], "gates": gate_specs},
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
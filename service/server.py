@@ -0,0 +1,452 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import socketserver
+import threading
+import time
+import uuid
+
+from core import Gate, PackedTruthTable
+from synthesis import ExactCircuitSynthesis
+from .protocol import (gate_from_spec, gate_to_spec, table_to_spec, circuit_to_spec,
+                       rename_circuit_spec, target_key)
+
+DEFAULT_PORT = 8765
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+@dataclass
+class _Task:
+    key: str
+    spec: dict
+    priority: int
+    state: str = QUEUED
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    subscribers: int = 0
+    cancel_requested: bool = False
+    worker: Optional['_Worker'] = None
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    connection: object
+
+@dataclass
+class _Job:
+    id: str
+    task: _Task
+    input_names: List[str]
+    output_names: List[str]
+    cancelled: bool = False
+    cached: bool = False
+    finished_at: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+
+class SynthesisService:
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 4096, job_ttl: float = 3600.0):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache_size = cache_size
+        self.job_ttl = job_ttl
+        self._lock = threading.Condition()
+        self._queue: List[Tuple[int, int, _Task]] = []
+        self._sequence = itertools.count()
+        self._in_flight: Dict[Tuple[str, int], _Task] = {}
+        self._running: Dict[object, _Task] = {}
+        self._idle: List[_Worker] = []
+        self._jobs: Dict[str, _Job] = {}
+        self._cache: "OrderedDict[str, Tuple[Optional[dict], int]]" = OrderedDict()
+        self._stats = {'submitted': 0, 'cache_hits': 0, 'deduplicated': 0, 'completed': 0,
+                       'failed': 0, 'cancelled': 0}
+        self._wake_reader, self._wake_writer = multiprocessing.Pipe(duplex=False)
+        # Workers are persistent and started from a clean server process, never
+        # forked from this one once the scheduler and HTTP threads are running.
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        self._scheduler: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> 'SynthesisService':
+        if self._scheduler is None:
+            self._idle = [self._start_worker() for _ in range(self.workers)]
+            self._scheduler = threading.Thread(target=self._schedule, name="synthesis-scheduler", daemon=True)
+            self._scheduler.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+        self._wake()
+        if self._scheduler is not None:
+            self._scheduler.join()
+        workers = self._idle + [task.worker for task in self._running.values()]
+        for worker in workers:
+            self._stop_worker(worker)
+        self._idle = []
+        self._running.clear()
+
+    def submit(self, request: dict) -> dict:
+        input_names = list(request["inputs"])
+        output_names = list(request["outputs"])
+        if "columns" in request:
+            columns = list(request["columns"])
+        else:
+            rows = [(tuple(inputs), tuple(outputs)) for inputs, outputs in request["rows"]]
+            columns = table_to_spec(rows, input_names, output_names)
+        PackedTruthTable.from_hex(input_names, output_names, columns)
+
+        gate_specs = [gate_to_spec(gate_from_spec(gate)) for gate in request["gates"]]
+        max_gates = int(request.get("max_gates", 15))
+        priority = int(request.get("priority", 0))
+        key = target_key(len(input_names), columns, gate_specs)
+
+        with self._lock:
+            self._stats['submitted'] += 1
+            job_id = uuid.uuid4().hex
+
+            cached = self._cache_lookup(key, max_gates)
+            if cached is not None:
+                self._stats['cache_hits'] += 1
+                task = _Task(key, {}, priority, DONE, cached[0])
+                job = _Job(job_id, task, input_names, output_names, cached=True, finished_at=time.time())
+                self._jobs[job_id] = job
+                return self._describe(job)
+
+            task = self._in_flight.get((key, max_gates))
+            if task is None:
+                spec = {"input_count": len(input_names), "output_count": len(output_names),
+                        "columns": columns, "gates": gate_specs, "max_gates": max_gates}
+                task = _Task(key, spec, priority)
+                self._in_flight[(key, max_gates)] = task
+                heapq.heappush(self._queue, (-priority, next(self._sequence), task))
+            else:
+                self._stats['deduplicated'] += 1
+                if priority > task.priority and task.state == QUEUED:
+                    task.priority = priority
+                    heapq.heappush(self._queue, (-priority, next(self._sequence), task))
+
+            task.subscribers += 1
+            job = _Job(job_id, task, input_names, output_names)
+            self._jobs[job_id] = job
+            self._lock.notify_all()
+            description = self._describe(job)
+
+        self._wake()
+        return description
+
+    def status(self, job_id: str, wait_seconds: float = 0.0) -> dict:
+        deadline = time.time() + wait_seconds
+        with self._lock:
+            job = self._get_job(job_id)
+            while not self._is_finished(job):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return self._describe(job)
+
+    def cancel(self, job_id: str) -> dict:
+        with self._lock:
+            job = self._get_job(job_id)
+            if self._is_finished(job):
+                return self._describe(job)
+
+            job.cancelled = True
+            job.finished_at = time.time()
+            task = job.task
+            task.subscribers -= 1
+            if task.subscribers == 0:
+                task.cancel_requested = True
+                if task.state == QUEUED:
+                    self._close_task(task, CANCELLED)
+            self._lock.notify_all()
+            description = self._describe(job)
+
+        self._wake()
+        return description
+
+    def stats(self) -> dict:
+        with self._lock:
+            # Cancelled tasks and entries superseded by a priority bump stay in
+            # the heap until popped, so only live entries are counted.
+            queued = sum(1 for negative_priority, _, task in self._queue
+                         if task.state == QUEUED and -negative_priority == task.priority)
+            return dict(self._stats, queued=queued, running=len(self._running),
+                        idle=len(self._idle), cached=len(self._cache), workers=self.workers)
+
+    def _get_job(self, job_id: str) -> _Job:
+        if job_id not in self._jobs:
+            raise KeyError(job_id)
+        return self._jobs[job_id]
+
+    @staticmethod
+    def _is_finished(job: _Job) -> bool:
+        return job.cancelled or job.task.state in (DONE, FAILED, CANCELLED)
+
+    def _describe(self, job: _Job) -> dict:
+        task = job.task
+        state = CANCELLED if job.cancelled else task.state
+        description = {"id": job.id, "status": state, "priority": task.priority, "cached": job.cached}
+        if state == DONE:
+            description["result"] = rename_circuit_spec(task.result, job.input_names, job.output_names)
+        elif state == FAILED:
+            description["error"] = task.error
+        return description
+
+    def _cache_lookup(self, key: str, max_gates: int) -> Optional[Tuple[Optional[dict]]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        result, searched_gates = entry
+        self._cache.move_to_end(key)
+        if result is not None:
+            # Results are minimum circuits, so a smaller limit is a proven miss.
+            return (result,) if len(result["gates"]) <= max_gates else (None,)
+        if searched_gates >= max_gates:
+            return (None,)
+        return None
+
+    def _cache_store(self, key: str, result: Optional[dict], max_gates: int) -> None:
+        previous = self._cache.get(key)
+        if previous is not None and previous[0] is not None and result is None:
+            return
+        self._cache[key] = (result, max_gates)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _wake(self) -> None:
+        self._wake_writer.send_bytes(b'')
+
+    def _schedule(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                self._terminate_cancelled()
+                self._start_ready_tasks()
+                self._expire_jobs()
+                connections = list(self._running)
+
+            for connection in wait(connections + [self._wake_reader], timeout=1.0):
+                if connection is self._wake_reader:
+                    while connection.poll():
+                        connection.recv_bytes()
+                    continue
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    message = {"error": "worker exited unexpectedly", "worker_lost": True}
+                with self._lock:
+                    self._finish(connection, message)
+
+    def _start_worker(self) -> _Worker:
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(target=_worker_loop, args=(child_connection,),
+                                        name="synthesis-worker", daemon=True)
+        process.start()
+        child_connection.close()
+        return _Worker(process, connection)
+
+    @staticmethod
+    def _stop_worker(worker: _Worker) -> None:
+        worker.process.terminate()
+        worker.process.join()
+        worker.connection.close()
+
+    def _start_ready_tasks(self) -> None:
+        while self._queue and self._idle:
+            negative_priority, _, task = heapq.heappop(self._queue)
+            if task.state != QUEUED or -negative_priority != task.priority:
+                continue
+            worker = self._idle.pop()
+            try:
+                worker.connection.send(task.spec)
+            except OSError:
+                # The worker died while idle; replace it and retry the task.
+                self._stop_worker(worker)
+                self._idle.append(self._start_worker())
+                heapq.heappush(self._queue, (negative_priority, next(self._sequence), task))
+                continue
+            task.worker = worker
+            task.state = RUNNING
+            self._running[worker.connection] = task
+            self._lock.notify_all()
+
+    def _terminate_cancelled(self) -> None:
+        # A running search cannot be interrupted, so its worker is replaced.
+        for connection, task in list(self._running.items()):
+            if task.cancel_requested:
+                del self._running[connection]
+                self._stop_worker(task.worker)
+                self._idle.append(self._start_worker())
+                self._close_task(task, CANCELLED)
+
+    def _finish(self, connection, message: dict) -> None:
+        task = self._running.pop(connection, None)
+        if task is None:
+            return
+        if "worker_lost" in message:
+            self._stop_worker(task.worker)
+            self._idle.append(self._start_worker())
+        else:
+            self._idle.append(task.worker)
+
+        if task.cancel_requested:
+            self._close_task(task, CANCELLED)
+        elif "error" in message:
+            task.error = message["error"]
+            self._close_task(task, FAILED)
+        else:
+            task.result = message["result"]
+            self._cache_store(task.key, task.result, task.spec["max_gates"])
+            self._close_task(task, DONE)
+
+    def _close_task(self, task: _Task, state: str) -> None:
+        task.state = state
+        task.worker = None
+        self._in_flight.pop((task.key, task.spec.get("max_gates")), None)
+        self._stats[{DONE: 'completed', FAILED: 'failed', CANCELLED: 'cancelled'}[state]] += 1
+        now = time.time()
+        for job in self._jobs.values():
+            if job.task is task and job.finished_at is None:
+                job.finished_at = now
+        self._lock.notify_all()
+
+    def _expire_jobs(self) -> None:
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+def _worker_loop(connection) -> None:
+    libraries: Dict[str, List[Gate]] = {}
+    while True:
+        try:
+            spec = connection.recv()
+        except EOFError:
+            return
+        connection.send(_run_task(spec, libraries))
+
+def _run_task(spec: dict, libraries: Dict[str, List[Gate]]) -> dict:
+    try:
+        library_key = json.dumps(spec["gates"], sort_keys=True)
+        if library_key not in libraries:
+            libraries[library_key] = [gate_from_spec(gate) for gate in spec["gates"]]
+        input_names = [f"i{i}" for i in range(spec["input_count"])]
+        output_names = [f"o{i}" for i in range(spec["output_count"])]
+        table = PackedTruthTable.from_hex(input_names, output_names, spec["columns"])
+        synthesizer = ExactCircuitSynthesis(libraries[library_key], max_gates=spec["max_gates"], verbose=False)
+        circuit = synthesizer.synthesize(table, input_names, output_names)
+        return {"result": circuit_to_spec(circuit)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> SynthesisService:
+        return self.server.service
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            response = self.service.submit(request)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json(400, {"error": f"invalid job: {e}"})
+        self._send_json(200 if response["status"] == DONE else 202, response)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ["stats"]:
+            return self._send_json(200, self.service.stats())
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            wait_seconds = float(parse_qs(url.query).get("wait", ["0"])[0])
+            self._send_json(200, self.service.status(parts[1], wait_seconds))
+        except KeyError:
+            self._send_json(404, {"error": f"unknown job {parts[1]}"})
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+    def do_DELETE(self):
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            self._send_json(200, self.service.cancel(parts[1]))
+        except KeyError:
+            self._send_json(404, {"error": f"unknown job {parts[1]}"})
+
+    def _send_json(self, code: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def create_server(service: SynthesisService,
+                  host: str = "127.0.0.1",
+                  port: int = DEFAULT_PORT,
+                  unix_socket: Optional[str] = None,
+                  verbose: bool = False):
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = _UnixHTTPServer(unix_socket, _RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+def run_server(host: str = "127.0.0.1",
+               port: int = DEFAULT_PORT,
+               unix_socket: Optional[str] = None,
+               workers: Optional[int] = None,
+               cache_size: int = 4096) -> None:
+    service = SynthesisService(workers, cache_size).start()
+    server = create_server(service, host, port, unix_socket, verbose=True)
+    where = unix_socket if unix_socket is not None else f"http://{host}:{port}"
+    print(f"CircSynth service listening on {where} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        service.stop()
+        if unix_socket is not None and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
@@ -1,3 +1,8 @@
 from .exact_synthesis import ExactCircuitSynthesis
+from .stochastic_synthesis import StochasticCircuitSynthesis
+from .function_index import FunctionIndex
+from .rewriting import CutRewriting
+from .lut_mapping import LutMapping
+from .symmetry import InputSymmetries, input_symmetries
 
-__all__ = ["ExactCircuitSynthesis"]
+__all__ = ["ExactCircuitSynthesis", "StochasticCircuitSynthesis", "FunctionIndex", "CutRewriting", "LutMapping", "InputSymmetries", "input_symmetries"]
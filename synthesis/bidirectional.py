@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional, Tuple, Union
+from itertools import product
+
+from core import Gate, Circuit
+from .function_index import CircuitEnumerator, Construction
+
+Operand = Tuple[int, int, Union[int, Construction]]
+
+# Operands are also indexed by their values on each block of this many rows.
+_BLOCK_ROWS = 8
+
+class MeetInTheMiddle:
+    def __init__(self, available_gates: List[Gate], input_functions: List[int], target: int, mask: int):
+        self.available_gates = available_gates
+        self.input_functions = input_functions
+        self.target = target
+        self.mask = mask
+        self.depth = 0
+        self.functions: Dict[int, Tuple[int, Construction]] = {}
+        self._operands: List[Operand] = []
+        self._operand_index: Dict[int, Operand] = {}
+        self._block_indices: List[Dict[int, List[Operand]]] = []
+        self._allowed = [self._allowed_values(gate) for gate in available_gates]
+        self._build_operands()
+
+    def extend(self, depth: int) -> None:
+        if depth <= self.depth:
+            return
+        enumerator = CircuitEnumerator(self.available_gates, self.input_functions, self.mask, depth)
+        enumerator.extend()
+        self.functions = enumerator.entries
+        self.depth = depth
+        self._build_operands()
+
+    def search(self, gate_limit: int, input_names: List[str], output_name: str) -> Optional[Circuit]:
+        # Returns a circuit of at most gate_limit gates, or None when there is
+        # none. The backward match can miss circuits whose operands share
+        # gates or cost more than the table depth, so a miss grows the exact
+        # forward table to gate_limit, which settles the limit.
+        self.extend((gate_limit + 1) // 2)
+        if gate_limit > self.depth:
+            match = self._match(gate_limit - 1)
+            if match is not None:
+                return self._build(match[0], match[1], input_names, output_name)
+            self.extend(gate_limit)
+
+        entry = self.functions.get(self.target)
+        if entry is not None and entry[0] <= gate_limit:
+            return self._build(None, [(entry[0], self.target, entry[1])], input_names, output_name)
+        return None
+
+    def _build_operands(self) -> None:
+        operands = [(0, func, i) for i, func in enumerate(self.input_functions)]
+        operands.extend((cost, func, construction) for func, (cost, construction) in self.functions.items()
+                        if func not in self.input_functions)
+        operands.sort(key=lambda operand: operand[0])
+        self._operands = operands
+        self._operand_index = {}
+        for operand in operands:
+            self._operand_index.setdefault(operand[1], operand)
+        block_mask = (1 << _BLOCK_ROWS) - 1
+        self._block_indices = []
+        for offset in range(0, self.mask.bit_length(), _BLOCK_ROWS):
+            index: Dict[int, List[Operand]] = {}
+            for operand in operands:
+                index.setdefault((operand[1] >> offset) & block_mask, []).append(operand)
+            self._block_indices.append(index)
+
+    @staticmethod
+    def _allowed_values(gate: Gate) -> Dict[Tuple[Tuple[int, ...], int], Tuple[int, ...]]:
+        # For each value of the leading inputs and each output value, the
+        # values the last input may take.
+        allowed = {}
+        for prefix in product((0, 1), repeat=gate.input_count - 1):
+            for output in (0, 1):
+                allowed[prefix, output] = tuple(y for y in (0, 1) if gate.truth_table[prefix + (y,)][0] == output)
+        return allowed
+
+    def _match(self, budget: int) -> Optional[Tuple[int, List[Operand]]]:
+        # Backward step: each choice of leading operands pins the last input
+        # of the final gate to a cube, which is looked up in the forward table.
+        for gate_index, gate in enumerate(self.available_gates):
+            if gate.output_count != 1:
+                continue
+            symmetric = gate.is_symmetric()
+            stack = [((), 0, 0)]
+            while stack:
+                prefix, cost, start = stack.pop()
+                if len(prefix) == gate.input_count - 1:
+                    last = self._find_last(gate_index, prefix, budget - cost)
+                    if last is not None:
+                        return gate_index, list(prefix) + [last]
+                    continue
+                for position in range(start if symmetric else 0, len(self._operands)):
+                    operand = self._operands[position]
+                    if cost + operand[0] > budget:
+                        break
+                    stack.append((prefix + (operand,), cost + operand[0], position))
+        return None
+
+    def _find_last(self, gate_index: int, prefix: Tuple[Operand, ...], budget: int) -> Optional[Operand]:
+        allowed = self._allowed[gate_index]
+        mask = self.mask
+        forced_one = forced_zero = 0
+        for values in product((0, 1), repeat=len(prefix)):
+            rows = mask
+            for operand, value in zip(prefix, values):
+                rows &= operand[1] if value else ~operand[1]
+            for output in (0, 1):
+                class_rows = rows & (self.target if output else ~self.target) & mask
+                if not class_rows:
+                    continue
+                choices = allowed[values, output]
+                if not choices:
+                    return None
+                if choices == (1,):
+                    forced_one |= class_rows
+                elif choices == (0,):
+                    forced_zero |= class_rows
+
+        care = forced_one | forced_zero
+        free = mask & ~care
+        if free == 0:
+            operand = self._operand_index.get(forced_one)
+            return operand if operand is not None and operand[0] <= budget else None
+
+        if bin(free).count("1") <= 6:
+            free_bits = [1 << bit for bit in range(free.bit_length()) if (free >> bit) & 1]
+            best = None
+            for chosen in product((0, 1), repeat=len(free_bits)):
+                func = forced_one | sum(bit for bit, take in zip(free_bits, chosen) if take)
+                operand = self._operand_index.get(func)
+                if operand is not None and operand[0] <= budget and (best is None or operand[0] < best[0]):
+                    best = operand
+            return best
+
+        # Probe the block of rows that pins the operand down the most; each
+        # bucket is in cost order, so its first full match is its cheapest.
+        block_mask = (1 << _BLOCK_ROWS) - 1
+        block = max(range(len(self._block_indices)),
+                    key=lambda i: bin((care >> (i * _BLOCK_ROWS)) & block_mask).count("1"))
+        offset = block * _BLOCK_ROWS
+        block_value = (forced_one >> offset) & block_mask
+        block_free = (free >> offset) & block_mask
+        best = None
+        subset = block_free
+        while True:
+            for operand in self._block_indices[block].get(block_value | subset, ()):
+                if operand[0] > budget or (best is not None and operand[0] >= best[0]):
+                    break
+                if operand[1] & care == forced_one:
+                    best = operand
+                    break
+            if subset == 0:
+                return best
+            subset = (subset - 1) & block_free
+
+    def _build(self, gate_index: Optional[int], operands: List[Operand],
+               input_names: List[str], output_name: str) -> Circuit:
+        circuit = Circuit(input_names, [output_name])
+        shared: Dict[Tuple[int, Tuple[str, ...]], str] = {}
+
+        def add(index: int, input_sigs: List[str], output_sigs: Optional[List[str]] = None) -> str:
+            gate = self.available_gates[index]
+            key = (index, tuple(sorted(input_sigs) if gate.is_symmetric() else input_sigs))
+            if output_sigs is None and key in shared:
+                return shared[key]
+            shared[key] = circuit.add_gate(gate, input_sigs, output_sigs)[0]
+            return shared[key]
+
+        def instantiate(operand: Operand, output_sigs: Optional[List[str]] = None) -> str:
+            if isinstance(operand[2], int):
+                return input_names[operand[2]]
+            signals = list(input_names)
+            for position, (index, inputs) in enumerate(operand[2]):
+                last = position == len(operand[2]) - 1
+                signals.append(add(index, [signals[i] for i in inputs], output_sigs if last else None))
+            return signals[-1]
+
+        if gate_index is None:
+            instantiate(operands[0], [output_name])
+        else:
+            add(gate_index, [instantiate(operand) for operand in operands], [output_name])
+        return circuit
@@ -1,112 +1,308 @@
-from typing import List, Tuple, Optional
-from itertools import combinations_with_replacement
+from typing import Dict, Iterator, List, Tuple, Optional
+from itertools import combinations_with_replacement, product
 import time
 
 from core import Gate, Circuit
+from .targets import TargetTable, target_functions
+from .symmetry import input_symmetries
+from .bidirectional import MeetInTheMiddle
 
 class ExactCircuitSynthesis:
-    def __init__(self, available_gates: List[Gate], max_gates: int = 15, enable_pruning: bool = True):
+    def __init__(self, available_gates: List[Gate], max_gates: int = 15, enable_pruning: bool = True,
+                 verbose: bool = True, bidirectional: bool = False):
         self.available_gates = available_gates
         self.max_gates = max_gates
         self.enable_pruning = enable_pruning
+        self.bidirectional = bidirectional
+        self.verbose = verbose
+        self._gate_indices = {gate.name: i for i, gate in enumerate(available_gates)}
+        self._symmetric = [gate.is_symmetric() for gate in available_gates]
+        self._symmetry_predecessors: Dict[str, str] = {}
         self._search_stats = {'nodes_explored': 0, 'nodes_pruned': 0}
 
     def synthesize(self,
-                   target_truth_table: List[Tuple[Tuple[int, ...], Tuple[int, ...]]],
+                   target_truth_table: TargetTable,
                    input_names: List[str],
                    output_names: List[str]) -> Optional[Circuit]:
-        self._reset_stats()
-
-        print(f"Starting synthesis: {len(input_names)} inputs -> {len(output_names)} outputs")
+        self._log(f"Starting synthesis: {len(input_names)} inputs -> {len(output_names)} outputs")
+        self._prepare_search(target_truth_table, input_names, output_names)
 
         total_start_time = time.time()
+        meet = self._meet_in_the_middle(target_truth_table, input_names, output_names)
 
         for gate_limit in range(1, self.max_gates + 1):
             start_time = time.time()
-            print(f"Trying {gate_limit} gates...", end=' ')
+            self._log(f"Trying {gate_limit} gates...", end=' ')
 
-            result = self._search_with_gate_limit(
-                target_truth_table, input_names, output_names, gate_limit
-            )
+            if meet is not None:
+                result = meet.search(gate_limit, input_names, output_names[0])
+            else:
+                result = self._search_with_gate_limit(
+                    target_truth_table, input_names, output_names, gate_limit
+                )
 
             elapsed_time = time.time() - start_time
 
             if result:
                 total_elapsed = time.time() - total_start_time
-                print(f"Found solution! (time: {elapsed_time:.3f}s)")
-                print(f"Total time: {total_elapsed:.3f}s")
-                print(f"Search stats: explored {self._search_stats['nodes_explored']} nodes, "
-                      f"pruned {self._search_stats['nodes_pruned']} nodes")
+                self._log(f"Found solution! (time: {elapsed_time:.3f}s)")
+                self._log(f"Total time: {total_elapsed:.3f}s")
+                self._log(f"Search stats: explored {self._search_stats['nodes_explored']} nodes, "
+                          f"pruned {self._search_stats['nodes_pruned']} nodes")
                 return result
             else:
-                print(f"No solution (time: {elapsed_time:.3f}s)")
+                self._log(f"No solution (time: {elapsed_time:.3f}s)")
 
         total_elapsed = time.time() - total_start_time
-        print(f"No solution found within {self.max_gates} gates limit")
-        print(f"Total time: {total_elapsed:.3f}s")
+        self._log(f"No solution found within {self.max_gates} gates limit")
+        self._log(f"Total time: {total_elapsed:.3f}s")
         return None
 
+    def iter_solutions(self,
+                       target_truth_table: TargetTable,
+                       input_names: List[str],
+                       output_names: List[str],
+                       max_depth: Optional[int] = None) -> Iterator[Circuit]:
+        self._reset_stats()
+        # Relabelled variants over symmetric inputs are distinct solutions.
+        self._symmetry_predecessors = {}
+
+        for gate_limit in range(1, self.max_gates + 1):
+            solutions = self._iter_search(
+                *self._initial_state(target_truth_table, input_names, output_names), gate_limit, max_depth
+            )
+            first = next(solutions, None)
+            if first is not None:
+                self._log(f"Minimum circuit size: {gate_limit} gates")
+                yield first
+                yield from solutions
+                return
+
+        self._log(f"No solution found within {self.max_gates} gates limit")
+
+    def _prepare_search(self,
+                        target_truth_table: TargetTable,
+                        input_names: List[str],
+                        output_names: List[str]) -> None:
+        self._reset_stats()
+        self._symmetry_predecessors = {}
+        if self.enable_pruning:
+            symmetries = input_symmetries(target_truth_table, len(input_names), len(output_names))
+            self._symmetry_predecessors = symmetries.predecessors(input_names)
+            for group in symmetries.symmetric:
+                self._log(f"Symmetric inputs: {', '.join(input_names[i] for i in group)}")
+
+    def _meet_in_the_middle(self,
+                            target_truth_table: TargetTable,
+                            input_names: List[str],
+                            output_names: List[str]) -> Optional[MeetInTheMiddle]:
+        if not self.bidirectional:
+            return None
+        if len(output_names) != 1 or any(gate.output_count != 1 for gate in self.available_gates):
+            self._log("Bidirectional search needs a single output and single-output gates; searching forward only")
+            return None
+        input_functions, output_functions, mask = target_functions(
+            target_truth_table, len(input_names), len(output_names)
+        )
+        return MeetInTheMiddle(self.available_gates, input_functions, output_functions[0], mask)
+
+    def _initial_state(self,
+                       target_truth_table: TargetTable,
+                       input_names: List[str],
+                       output_names: List[str]) -> Tuple[Circuit, Dict[str, int], Dict[str, int], int]:
+        input_functions, output_functions, mask = target_functions(
+            target_truth_table, len(input_names), len(output_names)
+        )
+        initial_circuit = Circuit(input_names, output_names)
+        signal_functions = dict(zip(input_names, input_functions))
+        output_targets = dict(zip(output_names, output_functions))
+        return initial_circuit, signal_functions, output_targets, mask
+
     def _search_with_gate_limit(self,
-                                target_truth_table: List[Tuple[Tuple[int, ...], Tuple[int, ...]]],
+                                target_truth_table: TargetTable,
                                 input_names: List[str],
                                 output_names: List[str],
                                 gate_limit: int) -> Optional[Circuit]:
-        initial_circuit = Circuit(input_names, output_names)
-        return self._backtrack_search(initial_circuit, target_truth_table, gate_limit)
+        return self._backtrack_search(
+            *self._initial_state(target_truth_table, input_names, output_names), gate_limit
+        )
 
     def _backtrack_search(self,
                           circuit: Circuit,
-                          target_truth_table: List[Tuple[Tuple[int, ...], Tuple[int, ...]]],
+                          signal_functions: Dict[str, int],
+                          target_functions: Dict[str, int],
+                          mask: int,
                           remaining_gates: int) -> Optional[Circuit]:
+        return next(self._iter_search(circuit, signal_functions, target_functions, mask, remaining_gates), None)
+
+    def _iter_search(self,
+                     circuit: Circuit,
+                     signal_functions: Dict[str, int],
+                     target_functions: Dict[str, int],
+                     mask: int,
+                     remaining_gates: int,
+                     max_depth: Optional[int] = None) -> Iterator[Circuit]:
         self._search_stats['nodes_explored'] += 1
 
-        if circuit.has_all_outputs_connected() and circuit.is_functionally_correct(target_truth_table):
-            return circuit
+        # Output placements are only accepted when they match the target, so a
+        # fully connected circuit is also a functionally correct one.
+        if circuit.has_all_outputs_connected():
+            yield circuit
+            return
+
+        for new_circuit, new_signal_functions in self._iter_children(
+                circuit, signal_functions, target_functions, mask, remaining_gates, max_depth):
+            yield from self._iter_search(
+                new_circuit, new_signal_functions, target_functions, mask, remaining_gates - 1, max_depth
+            )
 
+    def _iter_children(self,
+                       circuit: Circuit,
+                       signal_functions: Dict[str, int],
+                       target_functions: Dict[str, int],
+                       mask: int,
+                       remaining_gates: int,
+                       max_depth: Optional[int] = None) -> Iterator[Tuple[Circuit, Dict[str, int]]]:
         if remaining_gates <= 0:
-            return None
+            return
 
         if self.enable_pruning:
             missing_outputs = set(circuit.output_signals) - circuit.all_signals
             if len(missing_outputs) > remaining_gates:
                 self._search_stats['nodes_pruned'] += 1
-                return None
+                return
 
-        for gate_type in self.available_gates:
-            for placement in self._generate_all_placements(circuit, gate_type):
-                input_signals, output_signals = placement
+        order = _GateOrder(circuit, signal_functions, self._gate_indices, self._symmetric,
+                           self._symmetry_predecessors)
+        for gate_index, gate_type in enumerate(self.available_gates):
+            for placement in self._iter_placements(circuit, signal_functions, target_functions, mask, gate_type):
+                input_signals, output_signals, output_functions = placement
+
+                if not order.is_canonical(gate_index, input_signals):
+                    continue
+                if not order.respects_symmetries(input_signals):
+                    self._search_stats['nodes_pruned'] += 1
+                    continue
+                if max_depth is not None and order.level(input_signals) > max_depth:
+                    self._search_stats['nodes_pruned'] += 1
+                    continue
 
                 new_circuit = circuit.copy()
+                if output_signals is None:
+                    output_signals = new_circuit.generate_unique_signals(gate_type.output_count)
                 new_circuit.add_gate(gate_type, input_signals, output_signals)
 
-                result = self._backtrack_search(new_circuit, target_truth_table, remaining_gates - 1)
-                if result:
-                    return result
+                new_signal_functions = signal_functions.copy()
+                new_signal_functions.update(zip(output_signals, output_functions))
+                yield new_circuit, new_signal_functions
 
-        return None
+    def _iter_placements(self,
+                         circuit: Circuit,
+                         signal_functions: Dict[str, int],
+                         target_functions: Dict[str, int],
+                         mask: int,
+                         gate_type: Gate) -> Iterator[Tuple[List[str], Optional[List[str]], Tuple[int, ...]]]:
+        # Newest signals first: a fresh gate is most likely to build on the
+        # previous one, and the order is stable across runs.
+        available_signals = list(reversed(signal_functions))
+        existing_functions = set(signal_functions.values())
+        unconnected_outputs = [sig for sig in circuit.output_signals if sig not in circuit.all_signals]
+        unconnected_functions = {target_functions[sig] for sig in unconnected_outputs}
+        # Constant internal signals are only needed to build a constant output.
+        allows_constants = gate_type.is_constant() or any(
+            func == 0 or func == mask for func in target_functions.values()
+        )
 
-    def _generate_all_placements(self, circuit: Circuit, gate_type: Gate):
-        placements = []
-        available_signals = list(circuit.all_signals)
+        # Relabelling symmetric target inputs can reorder the pins of any gate,
+        # so asymmetric gates are tried with every input order.
+        if gate_type.is_symmetric():
+            input_combos = combinations_with_replacement(available_signals, gate_type.input_count)
+        else:
+            input_combos = product(available_signals, repeat=gate_type.input_count)
 
-        for input_combo in combinations_with_replacement(available_signals, gate_type.input_count):
+        for input_combo in input_combos:
             input_signals = list(input_combo)
+            output_functions = gate_type.evaluate_bits([signal_functions[sig] for sig in input_combo], mask)
 
-            new_internal_signals = circuit.generate_unique_signals(gate_type.output_count)
-            placements.append((input_signals, new_internal_signals))
+            if gate_type.output_count == 1:
+                for output_sig in unconnected_outputs:
+                    if target_functions[output_sig] == output_functions[0]:
+                        yield input_signals, [output_sig], output_functions
+            elif gate_type.output_count == len(unconnected_outputs) == len(circuit.output_signals):
+                if all(target_functions[sig] == func for sig, func in zip(circuit.output_signals, output_functions)):
+                    yield input_signals, circuit.output_signals[:], output_functions
 
-            if gate_type.output_count == len(circuit.output_signals):
-                unconnected_outputs = [sig for sig in circuit.output_signals if sig not in circuit.all_signals]
-                if len(unconnected_outputs) == gate_type.output_count:
-                    placements.append((input_signals, circuit.output_signals[:]))
+            if self._is_redundant(output_functions, existing_functions, unconnected_functions, mask, allows_constants):
+                continue
+            yield input_signals, None, output_functions
 
-            unconnected_outputs = [sig for sig in circuit.output_signals if sig not in circuit.all_signals]
-            if len(unconnected_outputs) > 0 and gate_type.output_count == 1:
-                for output_sig in unconnected_outputs:
-                    output_signals = [output_sig]
-                    placements.append((input_signals, output_signals))
+    @staticmethod
+    def _is_redundant(output_functions: Tuple[int, ...],
+                      existing_functions: set,
+                      unconnected_functions: set,
+                      mask: int,
+                      allows_constants: bool) -> bool:
+        for func in output_functions:
+            if func in existing_functions:
+                continue
+            if not allows_constants and (func == 0 or func == mask):
+                continue
+            if len(output_functions) == 1 and func in unconnected_functions:
+                continue
+            return False
+        return True
 
-        return placements
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
 
     def _reset_stats(self):
         self._search_stats = {'nodes_explored': 0, 'nodes_pruned': 0}
+
+class _GateOrder:
+    # Each circuit is visited only in its lexicographically smallest
+    # topological gate order: a gate that could have been placed earlier must
+    # sort after every gate placed since its inputs became available. This
+    # removes reorderings of the same netlist from the search.
+    def __init__(self, circuit: Circuit, signal_functions: Dict[str, int],
+                 gate_indices: Dict[str, int], symmetric: List[bool],
+                 symmetry_predecessors: Dict[str, str]):
+        self.positions = {sig: i for i, sig in enumerate(signal_functions)}
+        self.symmetric = symmetric
+        self.symmetry_predecessors = symmetry_predecessors
+        self.used_signals = set()
+        self.producers: Dict[str, int] = {}
+        self.levels = dict.fromkeys(circuit.input_signals, 0)
+        self.keys = []
+
+        for position, gate in enumerate(circuit.gate_instances):
+            self.keys.append(self.key(gate_indices[gate.gate_type.name], gate.input_signals))
+            self.used_signals.update(gate.input_signals)
+            level = self.level(gate.input_signals)
+            for sig in gate.output_signals:
+                self.producers[sig] = position
+                self.levels[sig] = level
+
+    def key(self, gate_index: int, input_signals: List[str]) -> Tuple[int, Tuple[int, ...]]:
+        positions = [self.positions[sig] for sig in input_signals]
+        if self.symmetric[gate_index]:
+            positions.sort()
+        return gate_index, tuple(positions)
+
+    def is_canonical(self, gate_index: int, input_signals: List[str]) -> bool:
+        key = self.key(gate_index, input_signals)
+        ready = max((self.producers[sig] + 1 for sig in input_signals if sig in self.producers), default=0)
+        return all(key > placed for placed in self.keys[ready:])
+
+    def respects_symmetries(self, input_signals: List[str]) -> bool:
+        # Among inputs the target is symmetric in, a circuit and its relabelled
+        # variants are equally good; only the variant whose smallest gate order
+        # first touches each input no later than its predecessor is kept.
+        for sig in input_signals:
+            predecessor = self.symmetry_predecessors.get(sig)
+            if predecessor is not None and predecessor not in self.used_signals and predecessor not in input_signals:
+                return False
+        return True
+
+    def level(self, input_signals: List[str]) -> int:
+        return max((self.levels[sig] for sig in input_signals), default=0) + 1
@@ -0,0 +1,286 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from itertools import combinations_with_replacement, product
+import multiprocessing
+import os
+import pickle
+import time
+
+from core import Gate, Circuit, PackedTruthTable
+from gates import compile_gate, gate_function
+from .targets import TargetTable, standard_functions
+
+GateKey = Tuple[int, Tuple[int, ...]]
+Construction = Tuple[GateKey, ...]
+
+# Lookups with more don't-care rows than this scan the index instead of
+# probing every completion.
+_COMPLETION_LIMIT = 12
+
+# Length of the gate prefixes the build is split into.
+_BRANCH_DEPTH = 2
+
+class FunctionIndex:
+    def __init__(self,
+                 available_gates: List[Gate],
+                 input_count: int,
+                 max_gates: int,
+                 checkpoint_path: Optional[str] = None,
+                 processes: Optional[int] = None,
+                 verbose: bool = True):
+        self.available_gates = [gate for gate in available_gates if gate.output_count == 1]
+        if not self.available_gates:
+            raise ValueError("Function index needs at least one single-output gate")
+        self.input_count = input_count
+        self.max_gates = max_gates
+        self.checkpoint_path = checkpoint_path
+        self.processes = processes or multiprocessing.cpu_count()
+        self.verbose = verbose
+        self.mask = (1 << (1 << input_count)) - 1
+        self.entries: Dict[int, Tuple[int, Construction]] = {}
+        self._completed_branches: set = set()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, function: int) -> bool:
+        return function in self.entries
+
+    def build(self) -> 'FunctionIndex':
+        self._load_checkpoint()
+        inputs_table = PackedTruthTable([f"x{i}" for i in range(self.input_count)], [])
+        input_functions = [inputs_table.projection(i) for i in range(self.input_count)]
+        enumerator = CircuitEnumerator(self.available_gates, input_functions, self.mask, self.max_gates)
+        branches = [branch for branch in enumerator.branches(_BRANCH_DEPTH) if branch not in self._completed_branches]
+
+        self._log(f"Building function index: {self.input_count} inputs, up to {self.max_gates} gates, "
+                  f"{len(branches)} of {len(branches) + len(self._completed_branches)} branches left")
+        start_time = time.time()
+        last_checkpoint = start_time
+
+        # Branches are disjoint parts of the search, so they run in any order
+        # and a checkpoint only needs the finished ones.
+        worker_args = (self.available_gates, input_functions, self.mask, self.max_gates)
+        if self.processes == 1 or len(branches) <= 1:
+            _start_worker(*worker_args)
+            results = map(_run_branch, branches)
+            pool = None
+        else:
+            pool = multiprocessing.get_context().Pool(min(self.processes, len(branches)), _start_worker, worker_args)
+            results = pool.imap_unordered(_run_branch, branches)
+
+        try:
+            for branch, entries in results:
+                self._merge(entries)
+                self._completed_branches.add(branch)
+                if self.checkpoint_path and time.time() - last_checkpoint >= 5.0:
+                    self._save_checkpoint()
+                    last_checkpoint = time.time()
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        if self.checkpoint_path:
+            self._save_checkpoint()
+        self._log(f"Indexed {len(self.entries)} functions in {time.time() - start_time:.3f}s")
+        return self
+
+    def cost(self, function: int, care: Optional[int] = None) -> Optional[int]:
+        entry = self.lookup(function, care)
+        return None if entry is None else entry[0]
+
+    def lookup(self, function: int, care: Optional[int] = None) -> Optional[Tuple[int, Construction]]:
+        if care is None or care == self.mask:
+            return self.entries.get(function)
+        # Rows outside the care mask may take either value; the cheapest
+        # completion wins.
+        function &= care
+        free = self.mask & ~care
+        if bin(free).count("1") > _COMPLETION_LIMIT:
+            candidates = (entry for candidate, entry in self.entries.items() if candidate & care == function)
+        else:
+            free_bits = [1 << bit for bit in range(free.bit_length()) if (free >> bit) & 1]
+            candidates = (self.entries.get(function | sum(bit for bit, take in zip(free_bits, chosen) if take))
+                          for chosen in product((0, 1), repeat=len(free_bits)))
+        return min((entry for entry in candidates if entry is not None), key=lambda entry: entry[0], default=None)
+
+    def circuit_for(self, function: int, input_names: List[str], output_name: str,
+                    care: Optional[int] = None) -> Optional[Circuit]:
+        entry = self.lookup(function, care)
+        if entry is None:
+            return None
+        return self._build_circuit(entry[1], input_names, output_name)
+
+    def synthesize(self,
+                   target_truth_table: TargetTable,
+                   input_names: List[str],
+                   output_names: List[str]) -> Optional[Circuit]:
+        if len(input_names) != self.input_count or len(output_names) != 1:
+            raise ValueError(f"Function index covers {self.input_count}-input, single-output targets")
+        care, function = standard_function(target_truth_table, self.input_count)
+        return self.circuit_for(function, input_names, output_names[0], care)
+
+    def _build_circuit(self, construction: Construction, input_names: List[str], output_name: str) -> Circuit:
+        circuit = Circuit(input_names, [output_name])
+        signals = list(input_names)
+        for position, (gate_index, inputs) in enumerate(construction):
+            output_sigs = [output_name] if position == len(construction) - 1 else None
+            signals.extend(circuit.add_gate(self.available_gates[gate_index],
+                                            [signals[i] for i in inputs], output_sigs))
+        return circuit
+
+    def _merge(self, entries: Dict[int, Tuple[int, Construction]]) -> None:
+        for function, entry in entries.items():
+            current = self.entries.get(function)
+            # Ties go to the smaller construction, so the result does not
+            # depend on the order branches finish in.
+            if current is None or entry < current:
+                self.entries[function] = entry
+
+    def _fingerprint(self) -> tuple:
+        return ("exhaustive", self.input_count, self.max_gates,
+                tuple((gate.name, gate.input_count, gate_function(gate)) for gate in self.available_gates))
+
+    def _load_checkpoint(self) -> None:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, 'rb') as f:
+            state = pickle.load(f)
+        if state["fingerprint"] != self._fingerprint():
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was built for a different library or size")
+        self.entries = state["entries"]
+        self._completed_branches = set(state["completed"])
+
+    def _save_checkpoint(self) -> None:
+        state = {"fingerprint": self._fingerprint(), "entries": self.entries,
+                 "completed": sorted(self._completed_branches)}
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+def standard_function(target_truth_table: TargetTable, input_count: int) -> Tuple[int, int]:
+    care, functions = standard_functions(target_truth_table, input_count, 1)
+    return care, functions[0]
+
+Branch = Tuple[GateKey, ...]
+
+class CircuitEnumerator:
+    # Exhaustive enumeration of small circuits, so every recorded cost is a
+    # true minimum; gate sharing inside a circuit is accounted for.
+    def __init__(self, gates: List[Gate], input_functions: List[int], mask: int, max_gates: int):
+        self.evaluators = [compile_gate(gate) for gate in gates]
+        self.arities = [gate.input_count for gate in gates]
+        self.symmetric = [gate.is_symmetric() for gate in gates]
+        self.input_count = len(input_functions)
+        self.max_gates = max_gates
+        self.mask = mask
+        self.functions = list(input_functions)
+        self.keys: List[GateKey] = []
+        self.existing = set(self.functions)
+        self.entries: Dict[int, Tuple[int, Construction]] = {}
+
+    def placements(self) -> Iterator[GateKey]:
+        signal_count = len(self.functions)
+        for gate_index, arity in enumerate(self.arities):
+            if self.symmetric[gate_index]:
+                combos = combinations_with_replacement(range(signal_count), arity)
+            else:
+                combos = product(range(signal_count), repeat=arity)
+            for inputs in combos:
+                key = (gate_index, inputs)
+                if self._is_canonical(key):
+                    yield key
+
+    def _is_canonical(self, key: GateKey) -> bool:
+        # Gates are kept in the lexicographically smallest topological order,
+        # so every circuit is enumerated exactly once: a gate that could have
+        # been placed earlier must sort after every gate placed since then.
+        ready = max((i - self.input_count + 1 for i in key[1] if i >= self.input_count), default=0)
+        return all(key > placed for placed in self.keys[ready:])
+
+    def place(self, key: GateKey) -> Optional[int]:
+        # Constants stay available as intermediates: a constant output may
+        # need one built from another.
+        gate_index, inputs = key
+        function = self.evaluators[gate_index](*[self.functions[i] for i in inputs], self.mask)
+        self._record(function, key)
+
+        if len(self.keys) + 1 >= self.max_gates or function in self.existing:
+            return None
+        self.functions.append(function)
+        self.keys.append(key)
+        self.existing.add(function)
+        return function
+
+    def unplace(self) -> None:
+        self.existing.discard(self.functions.pop())
+        self.keys.pop()
+
+    def extend(self) -> None:
+        for key in list(self.placements()):
+            if self.place(key) is not None:
+                self.extend()
+                self.unplace()
+
+    def branches(self, depth: int) -> List[Branch]:
+        # Gate prefixes up to the given length; the searches below them are
+        # disjoint and together cover every circuit.
+        branches: List[Branch] = []
+        for key in list(self.placements()):
+            if depth > 1 and self.place(key) is not None:
+                branches.extend((key,) + branch for branch in self.branches(depth - 1))
+                self.unplace()
+            else:
+                branches.append((key,))
+        return branches
+
+    def run_branch(self, branch: Branch) -> None:
+        for key in branch[:-1]:
+            self.place(key)
+        if self.place(branch[-1]) is not None:
+            self.extend()
+            self.unplace()
+        for _ in branch[:-1]:
+            self.unplace()
+
+    def _record(self, function: int, key: GateKey) -> None:
+        current = self.entries.get(function)
+        if current is not None and current[0] <= len(self.keys) + 1:
+            return
+        construction = self._cone(key)
+        if current is None or len(construction) < current[0]:
+            self.entries[function] = (len(construction), construction)
+
+    def _cone(self, key: GateKey) -> Construction:
+        needed = set()
+        stack = [i for i in key[1] if i >= self.input_count]
+        while stack:
+            position = stack.pop() - self.input_count
+            if position in needed:
+                continue
+            needed.add(position)
+            stack.extend(i for i in self.keys[position][1] if i >= self.input_count)
+
+        renumber = {i: i for i in range(self.input_count)}
+        construction = []
+        for position in sorted(needed):
+            gate_index, inputs = self.keys[position]
+            renumber[self.input_count + position] = self.input_count + len(construction)
+            construction.append((gate_index, tuple(renumber[i] for i in inputs)))
+        construction.append((key[0], tuple(renumber[i] for i in key[1])))
+        return tuple(construction)
+
+_worker_args: Optional[tuple] = None
+
+def _start_worker(gates: List[Gate], input_functions: List[int], mask: int, max_gates: int) -> None:
+    global _worker_args
+    _worker_args = (gates, input_functions, mask, max_gates)
+
+def _run_branch(branch: Branch) -> Tuple[Branch, Dict[int, Tuple[int, Construction]]]:
+    enumerator = CircuitEnumerator(*_worker_args)
+    enumerator.run_branch(branch)
+    return branch, enumerator.entries
@@ -0,0 +1,293 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import time
+
+from core import Gate, Circuit, GateInstance
+from gates import lut_gate, compile_gate
+
+Cut = FrozenSet[int]
+INFINITY = float("inf")
+
+class LutMapping:
+    def __init__(self,
+                 lut_size: int = 6,
+                 cut_limit: int = 8,
+                 optimize: str = "depth",
+                 area_rounds: int = 2,
+                 verbose: bool = True):
+        if not 1 <= lut_size <= 16:
+            raise ValueError(f"LUT size must be between 1 and 16, got {lut_size}")
+        if cut_limit < 1:
+            raise ValueError(f"Cut limit must be positive, got {cut_limit}")
+        if optimize not in ("depth", "area"):
+            raise ValueError(f"Unknown mapping objective: {optimize}")
+        self.lut_size = lut_size
+        self.cut_limit = cut_limit
+        self.optimize = optimize
+        self.area_rounds = area_rounds
+        self.verbose = verbose
+        self._evaluators: Dict[str, object] = {}
+        self.projections = [
+            [sum(1 << row for row in range(1 << count) if (row >> i) & 1) for i in range(count)]
+            for count in range(lut_size + 1)
+        ]
+
+    def map(self, circuit: Circuit) -> Circuit:
+        start_time = time.time()
+        mapper = _Mapper(self, circuit)
+        mapper.select_cuts(depth_oriented=self.optimize == "depth")
+        self._log(f"{'Depth' if self.optimize == 'depth' else 'Area'}-oriented cover: "
+                  f"{mapper.area()} LUTs, depth {mapper.depth()}")
+        for _ in range(self.area_rounds):
+            mapper.select_cuts()
+            mapper.select_cuts(exact_area=True)
+            self._log(f"Area recovery: {mapper.area()} LUTs, depth {mapper.depth()}")
+        result = mapper.to_circuit()
+        self._log(f"LUT mapping: {circuit.gate_count()} gates -> {result.gate_count()} "
+                  f"{self.lut_size}-LUTs, depth {mapper.depth()} (time: {time.time() - start_time:.3f}s)")
+        return result
+
+    def evaluator(self, gate: Gate):
+        evaluator = self._evaluators.get(gate.name)
+        if evaluator is None:
+            evaluator = self._evaluators[gate.name] = compile_gate(gate)
+        return evaluator
+
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+class _Mapper:
+    def __init__(self, engine: LutMapping, circuit: Circuit):
+        self.engine = engine
+        self.circuit = circuit
+        self.signals: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.gates: List[Optional[Gate]] = []
+        self.fanins: List[Tuple[int, ...]] = []
+        self.mappable: List[bool] = []
+        self.fixed_gates: Dict[int, GateInstance] = {}
+        self.order: List[int] = []
+
+        for sig in circuit.input_signals:
+            self._node(sig)
+        levels = circuit.get_gates_by_level()
+        for level in sorted(levels.keys()):
+            for gate in levels[level]:
+                fanins = tuple(self._node(sig) for sig in gate.input_signals)
+                # Multi-output and oversized gates are kept as they are; their
+                # outputs act as mapping boundaries.
+                fixed = gate.gate_type.output_count != 1 or len(set(fanins)) > engine.lut_size
+                for sig in gate.output_signals:
+                    node = self._node(sig)
+                    if fixed:
+                        self.fixed_gates[node] = gate
+                    self.gates[node] = gate.gate_type
+                    self.fanins[node] = fanins
+                    self.mappable[node] = not fixed
+                    self.order.append(node)
+
+        roots = [self.ids[sig] for sig in circuit.output_signals if sig in self.ids]
+        for gate in {id(gate): gate for gate in self.fixed_gates.values()}.values():
+            roots.extend(self.ids[sig] for sig in gate.input_signals)
+        self.roots = roots
+
+        count = len(self.signals)
+        self.cuts: List[List[Tuple[Cut, int]]] = [[(frozenset((node,)), 1 << (node & 63))] for node in range(count)]
+        self.best: List[Cut] = [frozenset(fanins) for fanins in self.fanins]
+        self.arrival: List[float] = [0] * count
+        self.flow: List[float] = [0.0] * count
+        self.required: List[float] = [INFINITY] * count
+        self.references: List[int] = [0] * count
+        self.fanout: List[float] = [0.0] * count
+        for node in self.order:
+            for leaf in set(self.fanins[node]):
+                self.fanout[leaf] += 1
+        for node in roots:
+            self.fanout[node] += 1
+
+    def _node(self, sig: str) -> int:
+        node = self.ids.get(sig)
+        if node is None:
+            node = self.ids[sig] = len(self.signals)
+            self.signals.append(sig)
+            self.gates.append(None)
+            self.fanins.append(())
+            self.mappable.append(False)
+        return node
+
+    def select_cuts(self, depth_oriented: bool = False, exact_area: bool = False) -> None:
+        lut_size = self.engine.lut_size
+        cut_limit = self.engine.cut_limit
+        arrival, flow, best, cuts = self.arrival, self.flow, self.best, self.cuts
+
+        for node in self.order:
+            fanins = self.fanins[node]
+            if not self.mappable[node]:
+                arrival[node] = 1 + max((arrival[leaf] for leaf in fanins), default=0)
+                flow[node] = (1 + sum(flow[leaf] for leaf in set(fanins))) / max(1.0, self.fanout[node])
+                continue
+
+            merged = {frozenset(): 0}
+            for fanin in set(fanins):
+                combined = {}
+                for leaves, signature in merged.items():
+                    for fanin_leaves, fanin_signature in cuts[fanin]:
+                        union = signature | fanin_signature
+                        if union.bit_count() > lut_size:
+                            continue
+                        cut = leaves | fanin_leaves
+                        if len(cut) <= lut_size:
+                            combined[cut] = union
+                merged = combined
+            # The current best cut stays a candidate so that required times
+            # met by the previous cover remain reachable.
+            if best[node] and best[node] not in merged:
+                merged[best[node]] = sum(1 << (leaf & 63) for leaf in best[node])
+
+            required = self.required[node]
+            scored = []
+            for cut, signature in merged.items():
+                cut_arrival = 1 + max(map(arrival.__getitem__, cut), default=0)
+                cut_flow = 1 + sum(map(flow.__getitem__, cut))
+                if depth_oriented:
+                    key = (cut_arrival, cut_flow, len(cut))
+                else:
+                    key = (cut_flow, cut_arrival, len(cut))
+                scored.append((key, cut_arrival <= required, cut, signature))
+            if not depth_oriented and any(feasible for _, feasible, _, _ in scored):
+                scored = [entry for entry in scored if entry[1]]
+            scored.sort(key=lambda entry: entry[0])
+
+            kept = []
+            for key, _, cut, signature in scored:
+                if any(other_signature & signature == other_signature and other <= cut
+                       for _, other, other_signature in kept):
+                    continue
+                kept.append((key, cut, signature))
+                if len(kept) == cut_limit:
+                    break
+
+            if exact_area:
+                if self.references[node] > 0:
+                    self._dereference(node)
+                chosen = None
+                for key, cut, _ in kept:
+                    best[node] = cut
+                    area = self._reference(node)
+                    self._dereference(node)
+                    if chosen is None or (area, key[1]) < chosen[0]:
+                        chosen = ((area, key[1]), cut)
+                best[node] = chosen[1]
+                if self.references[node] > 0:
+                    self._reference(node)
+            else:
+                best[node] = kept[0][1]
+
+            arrival[node] = 1 + max(map(arrival.__getitem__, best[node]), default=0)
+            flow[node] = (1 + sum(map(flow.__getitem__, best[node]))) / max(1.0, self.fanout[node])
+            cuts[node] = [cuts[node][0]] + [(cut, signature) for _, cut, signature in kept]
+
+        self._update_cover()
+
+    def _update_cover(self) -> None:
+        # Recount references of the chosen cover, blend them into the fanout
+        # estimates used by area flow, and propagate required times back from
+        # the roots.
+        references = [0] * len(self.signals)
+        for node in self.roots:
+            references[node] += 1
+        for node in reversed(self.order):
+            if references[node] > 0 and self.mappable[node]:
+                for leaf in self.best[node]:
+                    references[leaf] += 1
+        self.references = references
+
+        for node in self.order:
+            if self.mappable[node]:
+                self.fanout[node] = (2 * self.fanout[node] + references[node]) / 3
+
+        target = self.depth()
+        required = [INFINITY] * len(self.signals)
+        for node in self.roots:
+            required[node] = target
+        for node in reversed(self.order):
+            if references[node] > 0 or not self.mappable[node]:
+                for leaf in self.best[node]:
+                    required[leaf] = min(required[leaf], required[node] - 1)
+        self.required = required
+
+    def _reference(self, node: int) -> int:
+        area = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            area += 1
+            for leaf in self.best[node]:
+                self.references[leaf] += 1
+                if self.references[leaf] == 1 and self.mappable[leaf]:
+                    stack.append(leaf)
+        return area
+
+    def _dereference(self, node: int) -> int:
+        area = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            area += 1
+            for leaf in self.best[node]:
+                self.references[leaf] -= 1
+                if self.references[leaf] == 0 and self.mappable[leaf]:
+                    stack.append(leaf)
+        return area
+
+    def area(self) -> int:
+        return sum(1 for node in self.order if self.mappable[node] and self.references[node] > 0)
+
+    def depth(self) -> int:
+        return max((self.arrival[node] for node in self.roots), default=0)
+
+    def _cut_function(self, node: int, cut: List[int]) -> int:
+        mask = (1 << (1 << len(cut))) - 1
+        values = dict(zip(cut, self.engine.projections[len(cut)]))
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if current in values:
+                stack.pop()
+                continue
+            missing = [leaf for leaf in self.fanins[current] if leaf not in values]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            values[current] = self.engine.evaluator(self.gates[current])(
+                *[values[leaf] for leaf in self.fanins[current]], mask)
+        return values[node]
+
+    def _lut(self, node: int) -> Tuple[Gate, List[str]]:
+        cut = sorted(self.best[node])
+        function = self._cut_function(node, cut)
+        # Leaves the function turns out not to depend on are dropped.
+        projections = self.engine.projections[len(cut)]
+        support = [i for i, projection in enumerate(projections)
+                   if (function & projection) >> (1 << i) != function & ~projection]
+        reduced = 0
+        for row in range(1 << len(support)):
+            source = sum(((row >> j) & 1) << i for j, i in enumerate(support))
+            reduced |= ((function >> source) & 1) << row
+        return lut_gate(len(support), reduced), [self.signals[cut[i]] for i in support]
+
+    def to_circuit(self) -> Circuit:
+        result = Circuit(self.circuit.input_signals, self.circuit.output_signals)
+        emitted = set()
+        for node in self.order:
+            if self.mappable[node]:
+                if self.references[node] > 0:
+                    gate, input_sigs = self._lut(node)
+                    result.add_gate(gate, input_sigs, [self.signals[node]])
+                continue
+            gate = self.fixed_gates[node]
+            if id(gate) not in emitted:
+                emitted.add(id(gate))
+                result.add_gate(gate.gate_type, gate.input_signals, gate.output_signals)
+        return result
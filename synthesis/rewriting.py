@@ -0,0 +1,298 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from itertools import permutations
+import time
+
+from core import Gate, Circuit, GateInstance
+from gates import compile_gate
+from .exact_synthesis import ExactCircuitSynthesis
+from .function_index import FunctionIndex
+
+Cut = FrozenSet[str]
+Replacement = Tuple[Tuple[Gate, Tuple[int, ...]], ...]
+
+MAX_CONE_SIZE = 64
+
+class CutRewriting:
+    def __init__(self,
+                 available_gates: List[Gate],
+                 cut_size: int = 4,
+                 cut_limit: int = 8,
+                 max_gates: int = 5,
+                 function_index: Optional[FunctionIndex] = None,
+                 verbose: bool = True):
+        self.available_gates = [gate for gate in available_gates if gate.output_count == 1]
+        if not self.available_gates:
+            raise ValueError("Cut rewriting needs at least one single-output gate")
+        if function_index is not None and function_index.input_count < cut_size:
+            raise ValueError(f"Function index covers {function_index.input_count} inputs, cuts need {cut_size}")
+        self.cut_size = cut_size
+        self.cut_limit = cut_limit
+        self.max_gates = max_gates
+        self.function_index = function_index
+        self.verbose = verbose
+        self._canonical_forms: Dict[Tuple[int, int], Tuple[int, Tuple[int, ...]]] = {}
+        self._classes: Dict[Tuple[int, int], Tuple[Optional[Replacement], int]] = {}
+        self._evaluators: Dict[str, object] = {}
+        self.projections = [
+            [sum(1 << row for row in range(1 << count) if (row >> i) & 1) for i in range(count)]
+            for count in range(cut_size + 1)
+        ]
+
+    def rewrite(self, circuit: Circuit) -> Circuit:
+        start_time = time.time()
+        rewriter = _Rewriter(self, circuit)
+        rewrites, saved = rewriter.run()
+        result = rewriter.to_circuit()
+        self._log(f"Cut rewriting: {circuit.gate_count()} -> {result.gate_count()} gates, "
+                  f"{rewrites} rewrites saving {saved} gates, {len(self._classes)} cached classes "
+                  f"(time: {time.time() - start_time:.3f}s)")
+        return result
+
+    def evaluator(self, gate: Gate):
+        evaluator = self._evaluators.get(gate.name)
+        if evaluator is None:
+            evaluator = self._evaluators[gate.name] = compile_gate(gate)
+        return evaluator
+
+    def replacement(self, leaf_count: int, function: int, limit: int) -> Optional[Replacement]:
+        if self.function_index is not None:
+            return self._index_replacement(leaf_count, function, limit)
+
+        key = (leaf_count, function)
+        if key not in self._canonical_forms:
+            self._canonical_forms[key] = _canonical_form(leaf_count, function)
+        canonical, permutation = self._canonical_forms[key]
+
+        replacement, searched = self._classes.get((leaf_count, canonical), (None, 0))
+        if replacement is None and searched < limit:
+            replacement = self._resynthesize(leaf_count, canonical, limit)
+            self._classes[(leaf_count, canonical)] = (replacement, limit)
+        if replacement is None or len(replacement) > limit:
+            return None
+        return tuple(
+            (gate, tuple(permutation[i] if i < leaf_count else i for i in inputs))
+            for gate, inputs in replacement
+        )
+
+    def _index_replacement(self, leaf_count: int, function: int, limit: int) -> Optional[Replacement]:
+        index = self.function_index
+        # A function of fewer leaves repeats its table over the unused inputs.
+        stride = 1 << leaf_count
+        padded = sum(function << (i * stride) for i in range(1 << (index.input_count - leaf_count)))
+        entry = index.lookup(padded)
+        if entry is None or entry[0] > limit:
+            return None
+        offset = index.input_count - leaf_count
+        replacement = []
+        for gate_index, inputs in entry[1]:
+            if any(leaf_count <= i < index.input_count for i in inputs):
+                return None
+            replacement.append((index.available_gates[gate_index],
+                                tuple(i if i < leaf_count else i - offset for i in inputs)))
+        return tuple(replacement)
+
+    def _resynthesize(self, leaf_count: int, function: int, limit: int) -> Optional[Replacement]:
+        input_names = [f"c{i}" for i in range(leaf_count)]
+        rows = [
+            (tuple((row >> i) & 1 for i in range(leaf_count)), ((function >> row) & 1,))
+            for row in range(1 << leaf_count)
+        ]
+        synthesizer = ExactCircuitSynthesis(self.available_gates, max_gates=limit, verbose=False)
+        circuit = synthesizer.synthesize(rows, input_names, ["y"])
+        if circuit is None:
+            return None
+
+        signal_indices = {sig: i for i, sig in enumerate(input_names)}
+        replacement = []
+        for gate in circuit.gate_instances:
+            replacement.append((gate.gate_type, tuple(signal_indices[sig] for sig in gate.input_signals)))
+            signal_indices[gate.output_signals[0]] = leaf_count + len(replacement) - 1
+        return tuple(replacement)
+
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+def _canonical_form(leaf_count: int, function: int) -> Tuple[int, Tuple[int, ...]]:
+    # Gate count is invariant under input permutation, so the smallest
+    # permuted table names the class; input i of the class representative
+    # is leaf permutation[i] of the cut.
+    best = None
+    rows = range(1 << leaf_count)
+    for permutation in permutations(range(leaf_count)):
+        permuted = 0
+        for row in rows:
+            source = sum(((row >> i) & 1) << leaf for i, leaf in enumerate(permutation))
+            permuted |= ((function >> source) & 1) << row
+        if best is None or permuted < best[0]:
+            best = (permuted, permutation)
+    return best
+
+class _Rewriter:
+    def __init__(self, engine: CutRewriting, circuit: Circuit):
+        self.engine = engine
+        self.circuit = circuit
+        self.drivers: Dict[str, Tuple[Gate, List[str]]] = {}
+        self.fixed_gates: List[GateInstance] = []
+        self.references: Dict[str, int] = {}
+        self.cuts: Dict[str, List[Cut]] = {}
+        self.signal_names = set(circuit.input_signals)
+        self._counter = 0
+
+        order = []
+        levels = circuit.get_gates_by_level()
+        for level in sorted(levels.keys()):
+            for gate in levels[level]:
+                self.signal_names.update(gate.output_signals)
+                if gate.gate_type.output_count == 1:
+                    self.drivers[gate.output_signals[0]] = (gate.gate_type, list(gate.input_signals))
+                    order.append(gate.output_signals[0])
+                else:
+                    self.fixed_gates.append(gate)
+                for sig in gate.input_signals:
+                    self.references[sig] = self.references.get(sig, 0) + 1
+        for sig in circuit.output_signals:
+            self.references[sig] = self.references.get(sig, 0) + 1
+        self.order = order
+
+    def run(self) -> Tuple[int, int]:
+        rewrites = saved = 0
+        for root in self.order:
+            if root not in self.drivers:
+                continue
+            self.cuts[root] = self._enumerate_cuts(root)
+            if self.references.get(root, 0) == 0:
+                continue
+
+            best = None
+            for cut in self.cuts[root]:
+                if root in cut:
+                    continue
+                freed = self._mffc_size(root, cut)
+                if freed < 2:
+                    continue
+                function = self._cut_function(root, cut)
+                mask = (1 << (1 << len(cut))) - 1
+                if function is None or function == 0 or function == mask:
+                    continue
+                limit = min(freed - 1, self.engine.max_gates)
+                if best is not None:
+                    limit = min(limit, freed - best[0] - 1)
+                if limit < 1:
+                    continue
+                replacement = self.engine.replacement(len(cut), function, limit)
+                if replacement is not None:
+                    best = (freed - len(replacement), cut, replacement)
+
+            if best is not None:
+                self._replace(root, best[1], best[2])
+                rewrites += 1
+                saved += best[0]
+        return rewrites, saved
+
+    def _cuts_of(self, sig: str) -> List[Cut]:
+        cuts = self.cuts.get(sig)
+        if cuts is None:
+            cuts = self.cuts[sig] = [frozenset((sig,))]
+        return cuts
+
+    def _enumerate_cuts(self, root: str) -> List[Cut]:
+        cut_size = self.engine.cut_size
+        merged = {frozenset()}
+        for sig in set(self.drivers[root][1]):
+            merged = {
+                leaves for leaves in (partial | cut for partial in merged for cut in self._cuts_of(sig))
+                if len(leaves) <= cut_size
+            }
+
+        kept: List[Cut] = []
+        for leaves in sorted(merged, key=len):
+            if any(other <= leaves for other in kept):
+                continue
+            kept.append(leaves)
+            if len(kept) == self.engine.cut_limit:
+                break
+        return [frozenset((root,))] + kept
+
+    def _mffc_size(self, root: str, cut: Cut) -> int:
+        # Gates freed by replacing the root: every gate whose references all
+        # come from inside the cone, found by dereferencing on a scratch copy.
+        freed = 1
+        scratch: Dict[str, int] = {}
+        stack = list(self.drivers[root][1])
+        while stack:
+            sig = stack.pop()
+            if sig in cut or sig not in self.drivers:
+                continue
+            count = scratch.get(sig, self.references[sig]) - 1
+            scratch[sig] = count
+            if count == 0:
+                freed += 1
+                stack.extend(self.drivers[sig][1])
+        return freed
+
+    def _cut_function(self, root: str, cut: Cut) -> Optional[int]:
+        # Cuts of nodes above an earlier rewrite can go stale; a cone that
+        # escapes its leaves reaches an undriven signal and is rejected.
+        leaf_count = len(cut)
+        mask = (1 << (1 << leaf_count)) - 1
+        values = dict(zip(sorted(cut), self.engine.projections[leaf_count]))
+
+        stack = [root]
+        while stack:
+            sig = stack[-1]
+            if sig in values:
+                stack.pop()
+                continue
+            driver = self.drivers.get(sig)
+            if driver is None or len(values) > MAX_CONE_SIZE:
+                return None
+            gate, inputs = driver
+            missing = [s for s in inputs if s not in values]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            values[sig] = self.engine.evaluator(gate)(*[values[s] for s in inputs], mask)
+        return values[root]
+
+    def _replace(self, root: str, cut: Cut, replacement: Replacement) -> None:
+        signals = sorted(cut)
+        for position, (gate, inputs) in enumerate(replacement):
+            input_sigs = [signals[i] for i in inputs]
+            for sig in input_sigs:
+                self.references[sig] = self.references.get(sig, 0) + 1
+            if position == len(replacement) - 1:
+                self._dereference(root)
+                output_sig = root
+            else:
+                output_sig = self._fresh_signal()
+            self.drivers[output_sig] = (gate, input_sigs)
+            self.cuts[output_sig] = self._enumerate_cuts(output_sig)
+            signals.append(output_sig)
+
+    def _dereference(self, root: str) -> None:
+        stack = [root]
+        while stack:
+            sig = stack.pop()
+            _, inputs = self.drivers.pop(sig)
+            self.cuts.pop(sig, None)
+            for input_sig in inputs:
+                self.references[input_sig] -= 1
+                if self.references[input_sig] == 0 and input_sig in self.drivers:
+                    stack.append(input_sig)
+
+    def _fresh_signal(self) -> str:
+        while f"_r{self._counter}" in self.signal_names:
+            self._counter += 1
+        sig = f"_r{self._counter}"
+        self.signal_names.add(sig)
+        return sig
+
+    def to_circuit(self) -> Circuit:
+        result = Circuit(self.circuit.input_signals, self.circuit.output_signals)
+        for sig, (gate, inputs) in self.drivers.items():
+            result.add_gate(gate, inputs, [sig])
+        for gate in self.fixed_gates:
+            result.add_gate(gate.gate_type, gate.input_signals, gate.output_signals)
+        return result
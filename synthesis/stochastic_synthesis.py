@@ -0,0 +1,384 @@
+from typing import Dict, List, Optional, Tuple, Union
+import multiprocessing
+import random
+import time
+
+from core import Gate, Circuit
+from gates import compile_gate
+from .targets import TargetTable, target_functions, standard_functions
+from .exact_synthesis import ExactCircuitSynthesis
+
+Genome = Tuple[List[List[int]], List[int]]
+Macro = List[Tuple[Gate, Tuple[int, ...]]]
+
+# Building blocks of seed circuits, each synthesized over the library:
+# (input count, function over standard-order rows).
+_SEED_BLOCKS = {
+    "buffer": (1, 0b10), "not": (1, 0b01), "zero": (1, 0b00), "one": (1, 0b11),
+    "and": (2, 0b1000), "or": (2, 0b1110), "xor": (2, 0b0110),
+}
+
+class StochasticCircuitSynthesis:
+    def __init__(self,
+                 available_gates: List[Gate],
+                 node_count: int = 40,
+                 offspring: int = 4,
+                 restarts: int = 4,
+                 processes: Optional[int] = None,
+                 time_limit: float = 60.0,
+                 max_generations: Optional[int] = None,
+                 stall_generations: Optional[int] = 10000,
+                 construct_seed: bool = True,
+                 seed: Optional[int] = None,
+                 verbose: bool = True):
+        self.available_gates = [gate for gate in available_gates if gate.output_count == 1]
+        if not self.available_gates:
+            raise ValueError("Stochastic synthesis needs at least one single-output gate")
+        self.node_count = node_count
+        self.offspring = offspring
+        self.restarts = restarts
+        self.processes = processes or multiprocessing.cpu_count()
+        self.time_limit = time_limit
+        self.max_generations = max_generations
+        self.stall_generations = stall_generations
+        self.construct_seed = construct_seed
+        self.seed = seed
+        self._macros: Optional[Dict[str, Optional[Macro]]] = None
+        self.verbose = verbose
+
+    def synthesize(self,
+                   target_truth_table: TargetTable,
+                   input_names: List[str],
+                   output_names: List[str],
+                   seed_circuit: Optional[Circuit] = None) -> Optional[Circuit]:
+        input_functions, output_functions, mask = target_functions(
+            target_truth_table, len(input_names), len(output_names)
+        )
+
+        seed_genome = None
+        node_count = max(self.node_count, len(output_names))
+        if seed_circuit is None and self.construct_seed:
+            seed_circuit = self._seed_circuit(target_truth_table, input_names, output_names)
+            if seed_circuit is not None:
+                self._log(f"Seeding with a {seed_circuit.gate_count()}-gate decomposition")
+        if seed_circuit is not None:
+            seed_genome = self._encode_circuit(seed_circuit, input_names, output_names)
+            node_count = max(node_count, len(seed_genome[0]) + len(output_names))
+
+        base_seed = self.seed if self.seed is not None else random.randrange(1 << 30)
+        jobs = [
+            (self.available_gates, input_functions, output_functions, mask, node_count, self.offspring,
+             self.time_limit, self.max_generations, self.stall_generations, base_seed + restart, seed_genome)
+            for restart in range(self.restarts)
+        ]
+
+        self._log(f"Starting stochastic synthesis: {len(input_names)} inputs -> {len(output_names)} outputs, "
+                  f"{self.restarts} restarts on {min(self.processes, self.restarts)} processes")
+        start_time = time.time()
+
+        if self.processes == 1 or self.restarts == 1:
+            results = [_run_restart(job) for job in jobs]
+        else:
+            with multiprocessing.get_context().Pool(min(self.processes, self.restarts)) as pool:
+                results = pool.map(_run_restart, jobs)
+
+        best = None
+        for restart, (errors, active, genome) in enumerate(results):
+            status = f"{active} gates" if errors == 0 else f"{errors} wrong bits"
+            self._log(f"Restart {restart}: {status}")
+            if errors == 0 and (best is None or active < best[0]):
+                best = (active, genome)
+
+        self._log(f"Total time: {time.time() - start_time:.3f}s")
+        if best is None:
+            self._log("No correct circuit found")
+            return None
+
+        self._log(f"Best circuit: {best[0]} gates")
+        return self._decode_genome(best[1], input_names, output_names)
+
+    def _seed_circuit(self,
+                      target_truth_table: TargetTable,
+                      input_names: List[str],
+                      output_names: List[str]) -> Optional[Circuit]:
+        # A correct starting point, so that evolution only has to shrink it:
+        # a Shannon expansion when the library can invert, otherwise the
+        # algebraic normal form. The strashed builder shares equal
+        # sub-circuits between cofactors, terms and outputs.
+        macros = self._seed_macros()
+        if macros["buffer"] is None or not input_names:
+            return None
+
+        input_count = len(input_names)
+        care, functions = standard_functions(target_truth_table, input_count, len(output_names))
+        circuit = Circuit(input_names, output_names, strash=True)
+
+        def emit(name: str, operands: List[str], output_sigs: Optional[List[str]] = None) -> str:
+            signals = list(operands)
+            macro = macros[name]
+            for position, (gate, inputs) in enumerate(macro):
+                last = position == len(macro) - 1
+                signals.append(circuit.add_gate(gate, [signals[i] for i in inputs],
+                                                output_sigs if last else None)[0])
+            return signals[-1]
+
+        memo: Dict[Tuple[int, int, int], Union[int, str]] = {}
+
+        def shannon(level: int, function: int, rows: int) -> Union[int, str]:
+            function &= rows
+            if function == 0:
+                return 0
+            if function == rows:
+                return 1
+            half = 1 << (level - 1)
+            low = (1 << half) - 1
+            low_function, high_function = function & low, function >> half
+            low_rows, high_rows = rows & low, rows >> half
+            # Cofactors that agree wherever both are cared about are merged.
+            if (low_function ^ high_function) & low_rows & high_rows == 0:
+                return shannon(level - 1, low_function | high_function, low_rows | high_rows)
+
+            key = (level, function, rows)
+            if key not in memo:
+                pivot = input_names[level - 1]
+                low_sig = shannon(level - 1, low_function, low_rows)
+                high_sig = shannon(level - 1, high_function, high_rows)
+                if low_sig == 0 and high_sig == 1:
+                    memo[key] = pivot
+                elif low_sig == 1 and high_sig == 0:
+                    memo[key] = emit("not", [pivot])
+                elif low_sig == 0:
+                    memo[key] = emit("and", [pivot, high_sig])
+                elif high_sig == 0:
+                    memo[key] = emit("and", [emit("not", [pivot]), low_sig])
+                elif high_sig == 1:
+                    memo[key] = emit("or", [pivot, low_sig])
+                elif low_sig == 1:
+                    memo[key] = emit("or", [emit("not", [pivot]), high_sig])
+                else:
+                    memo[key] = emit("or", [emit("and", [pivot, high_sig]),
+                                            emit("and", [emit("not", [pivot]), low_sig])])
+            return memo[key]
+
+        def reed_muller(function: int) -> Optional[Union[int, str]]:
+            coefficients = function & care
+            for i in range(input_count):
+                clear = sum(1 << row for row in range(1 << input_count) if not (row >> i) & 1)
+                coefficients ^= (coefficients & clear) << (1 << i)
+            result: Optional[str] = None
+            for row in range(1, 1 << input_count):
+                if (coefficients >> row) & 1:
+                    term = None
+                    for i in range(input_count):
+                        if (row >> i) & 1:
+                            term = input_names[i] if term is None else emit("and", [term, input_names[i]])
+                    result = term if result is None else emit("xor", [result, term])
+            if coefficients & 1:
+                if result is None:
+                    return 1
+                if macros["one"] is None:
+                    return None
+                result = emit("xor", [result, emit("one", [input_names[0]])])
+            return 0 if result is None else result
+
+        if all(macros[name] is not None for name in ("not", "and", "or")):
+            signals = [shannon(input_count, function, care) for function in functions]
+        elif macros["xor"] is not None and macros["and"] is not None:
+            signals = [reed_muller(function) for function in functions]
+        else:
+            return None
+
+        for output_sig, signal in zip(output_names, signals):
+            if signal is None:
+                return None
+            if isinstance(signal, int):
+                constant = "one" if signal else "zero"
+                if macros[constant] is None:
+                    return None
+                emit(constant, [input_names[0]], [output_sig])
+            else:
+                # Outputs need gates of their own.
+                emit("buffer", [signal], [output_sig])
+        return circuit
+
+    def _seed_macros(self) -> Dict[str, Optional[Macro]]:
+        if self._macros is None:
+            self._macros = {}
+            synthesizer = ExactCircuitSynthesis(self.available_gates, max_gates=4, verbose=False)
+            for name, (input_count, function) in _SEED_BLOCKS.items():
+                input_names = [f"m{i}" for i in range(input_count)]
+                rows = [(tuple((row >> i) & 1 for i in range(input_count)), ((function >> row) & 1,))
+                        for row in range(1 << input_count)]
+                block = synthesizer.synthesize(rows, input_names, ["y"])
+                if block is None:
+                    self._macros[name] = None
+                    continue
+                signal_indices = {sig: i for i, sig in enumerate(input_names)}
+                macro = []
+                for gate in block.gate_instances:
+                    macro.append((gate.gate_type, tuple(signal_indices[sig] for sig in gate.input_signals)))
+                    signal_indices[gate.output_signals[0]] = input_count + len(macro) - 1
+                self._macros[name] = macro
+        return self._macros
+
+    def _encode_circuit(self, circuit: Circuit, input_names: List[str], output_names: List[str]) -> Genome:
+        gate_indices = {gate.name: i for i, gate in enumerate(self.available_gates)}
+        max_arity = max(gate.input_count for gate in self.available_gates)
+        signal_indices = {sig: i for i, sig in enumerate(input_names)}
+        nodes = []
+
+        levels = circuit.get_gates_by_level()
+        for level in sorted(levels.keys()):
+            for gate in levels[level]:
+                if gate.gate_type.name not in gate_indices:
+                    raise ValueError(f"Seed circuit uses gate {gate.gate_type.name} outside the library")
+                connections = [signal_indices[sig] for sig in gate.input_signals]
+                connections += [0] * (max_arity - len(connections))
+                signal_indices[gate.output_signals[0]] = len(input_names) + len(nodes)
+                nodes.append([gate_indices[gate.gate_type.name]] + connections)
+
+        outputs = []
+        for sig in output_names:
+            if signal_indices.get(sig, 0) < len(input_names):
+                raise ValueError(f"Seed circuit output {sig} is not driven by a gate")
+            outputs.append(signal_indices[sig])
+        return nodes, outputs
+
+    def _decode_genome(self, genome: Genome, input_names: List[str], output_names: List[str]) -> Circuit:
+        nodes, outputs = genome
+        input_count = len(input_names)
+        circuit = Circuit(input_names, output_names)
+        output_of = {index: name for name, index in zip(output_names, outputs)}
+        signal_names = list(input_names)
+
+        active = _active_nodes(nodes, outputs, input_count, [g.input_count for g in self.available_gates])
+        for node_index in range(len(nodes)):
+            signal_index = input_count + node_index
+            if node_index not in active:
+                signal_names.append(None)
+                continue
+            gate_type = self.available_gates[nodes[node_index][0]]
+            input_sigs = [signal_names[c] for c in nodes[node_index][1:1 + gate_type.input_count]]
+            output_sigs = [output_of[signal_index]] if signal_index in output_of else None
+            signal_names.append(circuit.add_gate(gate_type, input_sigs, output_sigs)[0])
+        return circuit
+
+    def _log(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
+
+def _active_nodes(nodes: List[List[int]], outputs: List[int], input_count: int, arities: List[int]) -> set:
+    active = set()
+    stack = [index - input_count for index in outputs]
+    while stack:
+        node_index = stack.pop()
+        if node_index < 0 or node_index in active:
+            continue
+        active.add(node_index)
+        node = nodes[node_index]
+        stack.extend(c - input_count for c in node[1:1 + arities[node[0]]])
+    return active
+
+class _Evolution:
+    def __init__(self, gates: List[Gate], input_functions: List[int], output_functions: List[int],
+                 mask: int, node_count: int, offspring: int, rng: random.Random):
+        self.evaluators = [compile_gate(gate) for gate in gates]
+        self.arities = [gate.input_count for gate in gates]
+        self.max_arity = max(self.arities)
+        self.input_functions = input_functions
+        self.output_functions = output_functions
+        self.input_count = len(input_functions)
+        self.mask = mask
+        self.node_count = node_count
+        self.offspring = offspring
+        self.rng = rng
+
+    def random_genome(self) -> Genome:
+        nodes = [self._random_node(i) for i in range(self.node_count)]
+        outputs = self.rng.sample(range(self.input_count, self.input_count + self.node_count),
+                                  len(self.output_functions))
+        return nodes, outputs
+
+    def pad_genome(self, genome: Genome) -> Genome:
+        nodes = [node[:] for node in genome[0]]
+        while len(nodes) < self.node_count:
+            nodes.append(self._random_node(len(nodes)))
+        return nodes, genome[1][:]
+
+    def _random_node(self, index: int) -> List[int]:
+        limit = self.input_count + index
+        return [self.rng.randrange(len(self.evaluators))] + [self.rng.randrange(limit) for _ in range(self.max_arity)]
+
+    def fitness(self, genome: Genome) -> Tuple[int, int]:
+        nodes, outputs = genome
+        active = _active_nodes(nodes, outputs, self.input_count, self.arities)
+        values = self.input_functions + [0] * self.node_count
+        mask = self.mask
+        for node_index in sorted(active):
+            node = nodes[node_index]
+            gate = node[0]
+            values[self.input_count + node_index] = self.evaluators[gate](*[values[c] for c in node[1:1 + self.arities[gate]]], mask)
+        errors = sum((values[index] ^ target).bit_count() for index, target in zip(outputs, self.output_functions))
+        return errors, len(active)
+
+    def mutate(self, genome: Genome) -> Genome:
+        nodes = [node[:] for node in genome[0]]
+        outputs = genome[1][:]
+        active = _active_nodes(nodes, outputs, self.input_count, self.arities)
+        genes_per_node = 1 + self.max_arity
+        gene_count = self.node_count * genes_per_node + len(outputs)
+
+        # Single active mutation: keep mutating until one change touches the
+        # phenotype, so no evaluation is spent on a silent offspring.
+        while True:
+            gene = self.rng.randrange(gene_count)
+            if gene >= self.node_count * genes_per_node:
+                position = gene - self.node_count * genes_per_node
+                taken = set(outputs)
+                choices = [i for i in range(self.input_count, self.input_count + self.node_count) if i not in taken]
+                if choices:
+                    outputs[position] = self.rng.choice(choices)
+                    return nodes, outputs
+                continue
+
+            node_index, offset = divmod(gene, genes_per_node)
+            node = nodes[node_index]
+            if offset == 0:
+                node[0] = self.rng.randrange(len(self.evaluators))
+                touched = True
+            else:
+                node[offset] = self.rng.randrange(self.input_count + node_index)
+                touched = offset <= self.arities[node[0]]
+            if node_index in active and touched:
+                return nodes, outputs
+
+    def run(self, parent: Genome, deadline: float, max_generations: Optional[int],
+            stall_generations: Optional[int]) -> Tuple[int, int, Genome]:
+        parent_fitness = self.fitness(parent)
+        generation = improved_at = 0
+        while parent_fitness[0] or parent_fitness[1] > len(self.output_functions):
+            if time.time() >= deadline or (max_generations is not None and generation >= max_generations):
+                break
+            if stall_generations is not None and generation - improved_at >= stall_generations:
+                break
+            generation += 1
+            best_child, best_fitness = None, None
+            for _ in range(self.offspring):
+                child = self.mutate(parent)
+                child_fitness = self.fitness(child)
+                if best_fitness is None or child_fitness <= best_fitness:
+                    best_child, best_fitness = child, child_fitness
+            # Accepting equally fit offspring lets the population drift
+            # through neutral networks instead of stalling.
+            if best_fitness < parent_fitness:
+                improved_at = generation
+            if best_fitness <= parent_fitness:
+                parent, parent_fitness = best_child, best_fitness
+        return parent_fitness[0], parent_fitness[1], parent
+
+def _run_restart(job) -> Tuple[int, int, Genome]:
+    (gates, input_functions, output_functions, mask, node_count, offspring,
+     time_limit, max_generations, stall_generations, seed, seed_genome) = job
+    evolution = _Evolution(gates, input_functions, output_functions, mask, node_count, offspring, random.Random(seed))
+    parent = evolution.pad_genome(seed_genome) if seed_genome is not None else evolution.random_genome()
+    return evolution.run(parent, time.time() + time_limit, max_generations, stall_generations)
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .targets import TargetTable, standard_functions
+
+@dataclass
+class InputSymmetries:
+    symmetric: List[List[int]] = field(default_factory=list)
+    antisymmetric: List[Tuple[int, int]] = field(default_factory=list)
+
+    def predecessors(self, input_names: List[str]) -> Dict[str, str]:
+        return {
+            input_names[group[k]]: input_names[group[k - 1]]
+            for group in self.symmetric for k in range(1, len(group))
+        }
+
+def input_symmetries(target_truth_table: TargetTable, input_count: int, output_count: int) -> InputSymmetries:
+    care, output_functions = standard_functions(target_truth_table, input_count, output_count)
+    functions = [care] + output_functions
+    row_count = 1 << input_count
+
+    projections = [sum(1 << row for row in range(row_count) if (row >> i) & 1) for i in range(input_count)]
+    groups = [[i] for i in range(input_count)]
+    group_of = list(range(input_count))
+    antisymmetric = []
+
+    for j in range(input_count):
+        for i in range(j):
+            # Swapping x_i and x_j exchanges rows 10 and 01 of the pair; the
+            # anti-symmetric swap x_i -> !x_j, x_j -> !x_i exchanges 00 and 11.
+            if group_of[i] != group_of[j]:
+                shift = (1 << j) - (1 << i)
+                low_rows = (projections[j] & ~projections[i]) >> shift
+                if all(_exchange(f, low_rows, shift) == f for f in functions):
+                    merged, absorbed = group_of[i], group_of[j]
+                    groups[merged].extend(groups[absorbed])
+                    groups[absorbed] = []
+                    for k in groups[merged]:
+                        group_of[k] = merged
+
+            shift = (1 << j) + (1 << i)
+            low_rows = (projections[j] & projections[i]) >> shift
+            if all(_exchange(f, low_rows, shift) == f for f in functions):
+                antisymmetric.append((i, j))
+
+    symmetric = sorted(sorted(group) for group in groups if len(group) > 1)
+    return InputSymmetries(symmetric, antisymmetric)
+
+def _exchange(function: int, low_rows: int, shift: int) -> int:
+    # Swaps each row in low_rows with the row shift positions above it.
+    high_rows = low_rows << shift
+    kept = function & ~(low_rows | high_rows)
+    return kept | ((function & low_rows) << shift) | ((function & high_rows) >> shift)
@@ -0,0 +1,47 @@
+from typing import List, Tuple, Union
+
+from core import PackedTruthTable
+
+TargetTable = Union[List[Tuple[Tuple[int, ...], Tuple[int, ...]]], PackedTruthTable]
+
+def target_functions(target_truth_table: TargetTable,
+                     input_count: int,
+                     output_count: int) -> Tuple[List[int], List[int], int]:
+    if isinstance(target_truth_table, PackedTruthTable):
+        care = target_truth_table.care_rows()
+        return ([target_truth_table.projection(i) & care for i in range(input_count)],
+                [target_truth_table.column(i) & care for i in range(output_count)],
+                care)
+
+    input_functions = [0] * input_count
+    output_functions = [0] * output_count
+
+    for row, (input_vals, output_vals) in enumerate(target_truth_table):
+        bit = 1 << row
+        for i, val in enumerate(input_vals):
+            if val:
+                input_functions[i] |= bit
+        for i, val in enumerate(output_vals):
+            if val:
+                output_functions[i] |= bit
+
+    return input_functions, output_functions, (1 << len(target_truth_table)) - 1
+
+def standard_functions(target_truth_table: TargetTable,
+                       input_count: int,
+                       output_count: int) -> Tuple[int, List[int]]:
+    # Bit r of each function is the value at the row whose input i is
+    # (r >> i) & 1; the care mask marks the rows the table specifies.
+    if isinstance(target_truth_table, PackedTruthTable):
+        care = target_truth_table.care_rows()
+        return care, [target_truth_table.column(i) & care for i in range(output_count)]
+
+    care = 0
+    output_functions = [0] * output_count
+    for input_vals, output_vals in target_truth_table:
+        bit = 1 << sum(val << i for i, val in enumerate(input_vals[:input_count]))
+        care |= bit
+        for i, val in enumerate(output_vals[:output_count]):
+            if val:
+                output_functions[i] |= bit
+    return care, output_functions
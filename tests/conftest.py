@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Gate, Circuit
+from gates import NOT, AND, OR, XOR, NAND, NOR, XNOR, MAJ3, XOR3, OFF, ON
+
+def random_circuit(seed: int,
+                   input_count: int = 6,
+                   gate_count: int = 60,
+                   output_count: int = 3,
+                   gates: Optional[List[Gate]] = None,
+                   locality: Optional[float] = None,
+                   strash: bool = False) -> Circuit:
+    # The last gates drive the outputs. With a locality, operands favour
+    # recent signals, so the netlist is deep rather than flat.
+    rng = random.Random(seed)
+    library = gates or [NOT, AND, OR, XOR, NAND, NOR, XNOR, MAJ3, XOR3, OFF, ON]
+    circuit = Circuit([f"x{i}" for i in range(input_count)], [f"y{i}" for i in range(output_count)], strash)
+    signals = list(circuit.input_signals)
+    for position in range(gate_count):
+        gate = rng.choice(library)
+        if locality is None:
+            inputs = [rng.choice(signals) for _ in range(gate.input_count)]
+        else:
+            inputs = [signals[max(0, len(signals) - 1 - int(rng.expovariate(locality)))]
+                      for _ in range(gate.input_count)]
+        remaining = gate_count - 1 - position
+        outputs = [f"y{remaining}"] if remaining < output_count else None
+        signals.extend(circuit.add_gate(gate, inputs, outputs))
+    return circuit
+
+def truth_table(input_count: int, function) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    return [(tuple((row >> i) & 1 for i in range(input_count)),
+             tuple(function(*[(row >> i) & 1 for i in range(input_count)])))
+            for row in range(1 << input_count)]
+
+def rows_of(function: int, input_count: int) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    # Single-output table of a truth vector in standard row order.
+    return truth_table(input_count, lambda *values: ((function >> sum(v << i for i, v in enumerate(values))) & 1,))
@@ -0,0 +1,32 @@
+import random
+
+from conftest import rows_of
+from gates import AND, OR, NOT, XOR, NAND
+from synthesis import ExactCircuitSynthesis
+
+def sizes(gates, function, input_count, max_gates):
+    names = [f"x{i}" for i in range(input_count)]
+    table = rows_of(function, input_count)
+    results = []
+    for bidirectional in (True, False):
+        circuit = ExactCircuitSynthesis(gates, max_gates=max_gates, verbose=False,
+                                        bidirectional=bidirectional).synthesize(table, names, ['y'])
+        if circuit is not None:
+            assert circuit.is_functionally_correct(table)
+        results.append(circuit and circuit.gate_count())
+    return results
+
+def test_matches_forward_search():
+    rng = random.Random(5)
+    for function in rng.sample(range(256), 15):
+        bidirectional, forward = sizes([XOR, AND, OR, NAND, NOT], function, 3, 6)
+        assert bidirectional == forward
+
+def test_operands_sharing_gates():
+    # XOR over NAND needs 4 gates only because both operands of the last
+    # gate share NAND(a, b).
+    assert sizes([NAND], 0b0110, 2, 5) == [4, 4]
+    rng = random.Random(2)
+    for function in rng.sample(range(256), 8):
+        bidirectional, forward = sizes([NAND], function, 3, 5)
+        assert bidirectional == forward
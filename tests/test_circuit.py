@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import random_circuit
+from core import Circuit
+from gates import NOT, AND, OR, XOR, OFF, ON
+
+def test_identical_gates_share_a_signal():
+    circuit = Circuit(["a", "b"], ["y"], strash=True)
+    first = circuit.add_gate(AND, ["a", "b"])
+    second = circuit.add_gate(AND, ["b", "a"])
+    assert first == second
+    assert circuit.gate_count() == 1
+
+def test_gates_fold():
+    circuit = Circuit(["a", "b"], ["y"], strash=True)
+    zero = circuit.add_gate(XOR, ["a", "a"])[0]
+    assert circuit.add_gate(XOR, ["b", "b"]) == [zero]
+    assert circuit.add_gate(AND, ["a", zero]) == [zero]
+    assert circuit.add_gate(OR, ["b", zero]) == ["b"]
+    one = circuit.add_gate(NOT, [zero])[0]
+    assert circuit.add_gate(AND, ["a", one]) == ["a"]
+    assert circuit.add_gate(OR, ["a", one]) == [one]
+    assert circuit.add_gate(ON, ["b"]) == [one]
+    assert circuit.add_gate(OFF, ["a"]) == [zero]
+    assert circuit.gate_count() == 2
+
+def test_folded_gates_keep_output_names():
+    circuit = Circuit(["a"], ["y"], strash=True)
+    zero = circuit.add_gate(XOR, ["a", "a"])[0]
+    assert circuit.add_gate(AND, ["a", zero], ["y"]) == ["y"]
+    assert circuit.evaluate((1,)) == (0,)
+
+def test_folded_gates_reject_internal_names():
+    circuit = Circuit(["a", "b"], ["y"], strash=True)
+    circuit.add_gate(AND, ["a", "b"])
+    assert circuit.add_gate(XOR, ["a", "a"], ["zero"]) == ["zero"]
+    with pytest.raises(ValueError):
+        circuit.add_gate(AND, ["a", "b"], ["t"])
+    with pytest.raises(ValueError):
+        circuit.add_gate(XOR, ["b", "b"], ["u"])
+    assert "t" not in circuit.all_signals and "u" not in circuit.all_signals
+
+def test_sweep_removes_dead_logic():
+    circuit = Circuit(["a", "b"], ["y"])
+    live = circuit.add_gate(AND, ["a", "b"])[0]
+    dead = circuit.add_gate(OR, ["a", "b"])[0]
+    circuit.add_gate(NOT, [dead])
+    circuit.add_gate(XOR, [live, "b"], ["y"])
+    assert circuit.sweep() == 2
+    assert circuit.gate_count() == 2
+    assert dead not in circuit.all_signals
+    assert circuit.sweep() == 0
+    assert [circuit.evaluate((a, b)) for b in (0, 1) for a in (0, 1)] == [(0,), (0,), (1,), (0,)]
+
+def test_strashed_build_simulates_like_plain_build():
+    for seed in range(5):
+        plain = random_circuit(seed, input_count=8, gate_count=200, output_count=5)
+        strashed = random_circuit(seed, input_count=8, gate_count=200, output_count=5, strash=True)
+        assert strashed.gate_count() < plain.gate_count()
+        words = [sum(((row >> i) & 1) << row for row in range(256)) for i in range(8)]
+        mask = (1 << 256) - 1
+        plain_values = plain.simulate_bits(words, mask)
+        strashed_values = strashed.simulate_bits(words, mask)
+        assert [plain_values[sig] for sig in plain.output_signals] == \
+               [strashed_values[sig] for sig in strashed.output_signals]
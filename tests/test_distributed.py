@@ -0,0 +1,56 @@
+import re
+import time
+from typing import List
+
+from conftest import truth_table
+from gates import NAND, AND, OR, NOT, XOR
+from service import DistributedExactSynthesis
+from synthesis import ExactCircuitSynthesis
+
+TARGETS = [
+    ([XOR, AND, OR], truth_table(3, lambda a, b, c: (a ^ b ^ c, (a & b) | (c & (a ^ b))))),
+    ([NAND], truth_table(2, lambda a, b: (a ^ b,))),
+    ([AND, OR, NOT], truth_table(3, lambda s, a, b: (b if s else a,))),
+    ([NAND], truth_table(3, lambda a, b, c: (int(a + b + c >= 2),))),
+]
+
+def names(rows):
+    return [f"x{i}" for i in range(len(rows[0][0]))], [f"y{i}" for i in range(len(rows[0][1]))]
+
+def synthesize_all(initial_subproblems: int, capsys) -> List[str]:
+    logs = []
+    with DistributedExactSynthesis([NAND], max_gates=8, port=0, local_workers=3,
+                                   initial_subproblems=initial_subproblems, heartbeat=0.01) as search:
+        for gates, rows in TARGETS:
+            input_names, output_names = names(rows)
+            expected = ExactCircuitSynthesis(gates, max_gates=8, verbose=False).synthesize(rows, input_names, output_names)
+            capsys.readouterr()
+            search.available_gates = gates
+            circuit = search.synthesize(rows, input_names, output_names)
+            log = capsys.readouterr().out
+
+            assert circuit.is_functionally_correct(rows)
+            assert circuit.gate_count() == expected.gate_count()
+            # The first solution ends the run: no larger limit is tried and
+            # the workers abandon what is left of their subproblems.
+            limits = [int(limit) for limit in re.findall(r"Trying (\d+) gates", log)]
+            assert limits == list(range(1, expected.gate_count() + 1))
+            deadline = time.time() + 2.0
+            while search._busy:
+                assert time.time() < deadline
+                time.sleep(0.01)
+            logs.append(log)
+    return logs
+
+def test_root_split_matches_exact_synthesis(capsys):
+    subproblems = []
+    for log in synthesize_all(16, capsys):
+        subproblems.append(int(re.search(r"(\d+) initial subproblems", log).group(1)))
+    assert max(subproblems) > 1
+
+def test_idle_workers_steal_work(capsys):
+    handed_off = 0
+    for log in synthesize_all(1, capsys):
+        assert "1 initial subproblems" in log
+        handed_off += int(re.search(r"(\d+) subproblems handed off", log).group(1))
+    assert handed_off > 0
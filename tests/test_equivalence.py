@@ -0,0 +1,90 @@
+import io
+
+from conftest import random_circuit
+from core import Circuit
+from formats import read_aiger, write_aiger
+from gates import NOT, AND, OR, XOR, NAND, NOR, XNOR, MAJ3
+from verification import equivalent
+
+LIBRARY = [NOT, AND, OR, XOR, NAND, NOR, XNOR, MAJ3]
+INPUT_COUNT = 20
+
+def wide_circuit(seed: int) -> Circuit:
+    return random_circuit(seed, input_count=INPUT_COUNT, gate_count=120, output_count=4,
+                          gates=LIBRARY, locality=0.2)
+
+def aiger_copy(circuit: Circuit) -> Circuit:
+    stream = io.BytesIO()
+    write_aiger(circuit, stream)
+    stream.seek(0)
+    return read_aiger(stream)
+
+def rename_outputs(circuit: Circuit, names: dict) -> Circuit:
+    renamed = circuit.copy()
+    for gate in renamed.gate_instances:
+        gate.input_signals = [names.get(sig, sig) for sig in gate.input_signals]
+        gate.output_signals = [names.get(sig, sig) for sig in gate.output_signals]
+    renamed.all_signals = {names.get(sig, sig) for sig in renamed.all_signals}
+    renamed.output_signals = [names.get(sig, sig) for sig in renamed.output_signals]
+    return renamed
+
+def with_rare_flip(circuit: Circuit, output: str) -> Circuit:
+    # The output flips only when every input is 1, which random simulation
+    # practically never hits, so the difference has to come from SAT.
+    mutated = rename_outputs(circuit, {output: "_original"})
+    mutated.output_signals = circuit.output_signals[:]
+    term = mutated.input_signals[0]
+    for sig in mutated.input_signals[1:]:
+        term = mutated.add_gate(AND, [term, sig])[0]
+    mutated.add_gate(XOR, ["_original", term], [output])
+    return mutated
+
+def assert_counterexample(result, circuit_a: Circuit, circuit_b: Circuit) -> None:
+    assert result.equivalent is False
+    assignment = dict(zip(circuit_a.input_signals, result.counterexample))
+    values_a = dict(zip(circuit_a.output_signals, circuit_a.evaluate(result.counterexample)))
+    values_b = circuit_b.evaluate(tuple(assignment[sig] for sig in circuit_b.input_signals))
+    assert values_b is not None
+    assert result.mismatched_outputs
+    for out_a, value_b in zip(circuit_a.output_signals, values_b):
+        assert (values_a[out_a] != value_b) == (out_a in result.mismatched_outputs)
+
+def test_wide_equivalent_pair():
+    for seed in range(3):
+        circuit = wide_circuit(seed)
+        copy = aiger_copy(circuit)
+        copy.input_signals = copy.input_signals[::-1]
+        result = equivalent(circuit, copy)
+        assert result.equivalent is True
+        assert result.proven_internal_points > 0
+
+def test_wide_mutation_is_found_by_sat():
+    for seed in range(3):
+        circuit = wide_circuit(seed)
+        mutated = with_rare_flip(aiger_copy(circuit), circuit.output_signals[1])
+        mutated.input_signals = mutated.input_signals[::-1]
+        result = equivalent(circuit, mutated)
+        assert result.counterexample == (1,) * INPUT_COUNT
+        assert result.mismatched_outputs == [circuit.output_signals[1]]
+        assert_counterexample(result, circuit, mutated)
+
+def test_wide_mutation_is_found_by_simulation():
+    circuit = wide_circuit(4)
+    mutated = circuit.copy()
+    driver = next(gate for gate in mutated.gate_instances if gate.output_signals == [circuit.output_signals[0]])
+    driver.gate_type = NOR if driver.gate_type is not NOR else OR
+    assert_counterexample(equivalent(circuit, mutated), circuit, mutated)
+
+def test_wide_outputs_match_by_name_then_position():
+    circuit = wide_circuit(5)
+    reordered = circuit.copy()
+    reordered.output_signals = circuit.output_signals[::-1]
+    assert equivalent(circuit, reordered).equivalent is True
+
+    names = {sig: f"z{position}" for position, sig in enumerate(circuit.output_signals)}
+    assert equivalent(circuit, rename_outputs(circuit, names)).equivalent is True
+
+    swapped = rename_outputs(circuit, names)
+    swapped.output_signals = swapped.output_signals[::-1]
+    result = equivalent(circuit, swapped)
+    assert_counterexample(result, circuit, swapped)
@@ -0,0 +1,39 @@
+import random
+
+from conftest import rows_of, truth_table
+from gates import AND, OR, NOT, XOR, NAND
+from synthesis import ExactCircuitSynthesis
+
+LIBRARY = [XOR, AND, OR, NAND, NOT]
+
+def targets():
+    yield truth_table(3, lambda a, b, c: ((a & b) | (b & c) | (a & c),))
+    yield truth_table(3, lambda a, b, c: (a ^ b ^ c, (a & b) | (c & (a ^ b))))
+    yield truth_table(3, lambda a, b, c: (b if a else c,))
+    rng = random.Random(7)
+    for _ in range(12):
+        function = rng.randrange(256)
+        yield rows_of(function, 3)
+
+def minimum_size(table, **options):
+    input_names = [f"x{i}" for i in range(len(table[0][0]))]
+    output_names = [f"y{i}" for i in range(len(table[0][1]))]
+    circuit = ExactCircuitSynthesis(LIBRARY, max_gates=6, verbose=False, **options).synthesize(
+        table, input_names, output_names
+    )
+    if circuit is not None:
+        assert circuit.is_functionally_correct(table)
+    return circuit and circuit.gate_count()
+
+def test_pruning_keeps_minimum_sizes():
+    for table in targets():
+        assert minimum_size(table) == minimum_size(table, enable_pruning=False)
+
+def test_constant_targets():
+    zero = truth_table(2, lambda a, b: (0,))
+    one = truth_table(2, lambda a, b: (1,))
+    engine = ExactCircuitSynthesis([NAND], max_gates=4, verbose=False)
+    for table, size in ((zero, 3), (one, 2)):
+        circuit = engine.synthesize(table, ['a', 'b'], ['y'])
+        assert circuit.gate_count() == size
+        assert circuit.is_functionally_correct(table)
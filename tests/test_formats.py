@@ -0,0 +1,72 @@
+import io
+
+from conftest import random_circuit
+from core import TruthTable, PackedTruthTable
+from formats import read_blif, write_blif, read_aiger, write_aiger, read_pla, write_pla
+from verification import equivalent
+
+def test_blif_round_trip():
+    for seed in range(5):
+        circuit = random_circuit(seed)
+        stream = io.StringIO()
+        write_blif(circuit, stream)
+        stream.seek(0)
+        loaded = read_blif(stream)
+        assert loaded.input_signals == circuit.input_signals
+        assert loaded.output_signals == circuit.output_signals
+        assert equivalent(circuit, loaded)
+
+def test_aiger_round_trip():
+    for seed in range(5):
+        circuit = random_circuit(seed)
+        for binary in (True, False):
+            stream = io.BytesIO()
+            write_aiger(circuit, stream, binary=binary)
+            stream.seek(0)
+            loaded = read_aiger(stream)
+            assert loaded.input_signals == circuit.input_signals
+            assert loaded.output_signals == circuit.output_signals
+            assert equivalent(circuit, loaded)
+
+def test_pla_round_trip():
+    rows = TruthTable.from_function(['a', 'b', 'c'], ['s', 'co'], lambda a, b, c: [a ^ b ^ c, int(a + b + c >= 2)])
+    table = TruthTable(['a', 'b', 'c'], ['s', 'co'])
+    table.rows = rows
+    stream = io.StringIO()
+    write_pla(table, stream)
+    stream.seek(0)
+    assert read_pla(stream).to_rows() == rows
+
+def test_pla_round_trip_keeps_dont_cares():
+    table = PackedTruthTable.from_integers(['a', 'b', 'c'], ['f', 'g'], [0b00010110, 0b11101000])
+    table.set_care(0, 0b01111111)
+    stream = io.StringIO()
+    write_pla(table, stream)
+    stream.seek(0)
+    loaded = read_pla(stream)
+    assert loaded == table
+    assert loaded.care(0) == 0b01111111
+    assert loaded.care(1) == loaded.mask
+
+def test_pla_types():
+    fd = read_pla(io.StringIO(".i 2\n.o 1\n.type fd\n1- 1\n01 -\n.e\n"))
+    assert fd.column(0) == 0b1010
+    assert fd.care(0) == 0b1011
+
+    fr = read_pla(io.StringIO(".i 2\n.o 1\n.type fr\n11 1\n00 0\n.e\n"))
+    assert fr.column(0) == 0b1000
+    assert fr.care(0) == 0b1001
+
+    f = read_pla(io.StringIO(".i 2\n.o 1\n.type f\n1- 1\n01 -\n.e\n"))
+    assert f.column(0) == 0b1010
+    assert not f.has_dont_cares()
+
+def test_pla_round_trip_wide_table():
+    inputs = [f"x{i}" for i in range(10)]
+    table = PackedTruthTable.from_integers(inputs, ['f', 'g'], [0x1234567 << 900, (1 << 1024) - 1 - (1 << 5)])
+    table.set_care(1, ~(0xff << 300) & table.mask)
+    table.set_column(1, table.column(1) & table.care(1))
+    stream = io.StringIO()
+    write_pla(table, stream)
+    stream.seek(0)
+    assert read_pla(stream) == table
@@ -0,0 +1,52 @@
+import random
+
+from conftest import rows_of
+from gates import AND, OR, XOR, NAND
+from synthesis import ExactCircuitSynthesis, FunctionIndex
+from synthesis.function_index import CircuitEnumerator
+
+def test_entries_build_correct_circuits():
+    index = FunctionIndex([AND, OR, XOR], 3, 4, processes=1, verbose=False).build()
+    names = ['a', 'b', 'c']
+    for function, (cost, _) in index.entries.items():
+        circuit = index.circuit_for(function, names, 'y')
+        assert circuit.gate_count() == cost
+        assert circuit.is_functionally_correct(rows_of(function, 3))
+
+def test_costs_match_exact_synthesis():
+    index = FunctionIndex([NAND], 3, 5, processes=1, verbose=False).build()
+    exact = ExactCircuitSynthesis([NAND], max_gates=5, verbose=False)
+    # Zero needs a constant intermediate; the others share gates between operands.
+    functions = [0x00, 0x87, 0x8e, 0x93, 0x95, 0x5a] + random.Random(1).sample(sorted(index.entries), 14)
+    for function in functions:
+        circuit = exact.synthesize(rows_of(function, 3), ['a', 'b', 'c'], ['y'])
+        assert circuit.gate_count() == index.cost(function)
+
+def test_index_covers_exact_synthesis():
+    index = FunctionIndex([AND, OR, XOR], 3, 3, verbose=False).build()
+    exact = ExactCircuitSynthesis([AND, OR, XOR], max_gates=3, verbose=False)
+    for function in range(256):
+        circuit = exact.synthesize(rows_of(function, 3), ['a', 'b', 'c'], ['y'])
+        assert index.cost(function) == (None if circuit is None else circuit.gate_count())
+
+def test_missing_rows_are_dont_cares():
+    index = FunctionIndex([AND, OR, XOR], 3, 3, processes=1, verbose=False).build()
+    # a & b is only specified where c is 0; the rows with c = 1 are free.
+    rows = [row for row in rows_of(0b10001000, 3) if not row[0][2]]
+    circuit = index.synthesize(rows, ['a', 'b', 'c'], ['y'])
+    assert circuit.gate_count() == 1
+    assert circuit.is_functionally_correct(rows)
+
+def test_checkpoint_resumes(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.ckpt")
+    full = FunctionIndex([NAND], 3, 4, processes=1, verbose=False).build()
+
+    # An interrupted build leaves only some branches in the checkpoint.
+    branches = CircuitEnumerator.branches
+    monkeypatch.setattr(CircuitEnumerator, "branches", lambda self, depth: branches(self, depth)[::2])
+    partial = FunctionIndex([NAND], 3, 4, checkpoint_path=path, processes=1, verbose=False).build()
+    assert len(partial) < len(full)
+    monkeypatch.undo()
+
+    resumed = FunctionIndex([NAND], 3, 4, checkpoint_path=path, processes=2, verbose=False).build()
+    assert resumed.entries == full.entries
@@ -0,0 +1,50 @@
+from conftest import truth_table
+from gates import AND, OR, NOT, XOR, NAND
+from synthesis import ExactCircuitSynthesis
+
+def structure(circuit):
+    # Circuits that differ only in gate order or in the operand order of
+    # symmetric gates share this key.
+    drivers = {sig: (gate, i) for gate in circuit.gate_instances for i, sig in enumerate(gate.output_signals)}
+    memo = {}
+
+    def key(sig):
+        if sig not in drivers:
+            return sig
+        if sig not in memo:
+            gate, index = drivers[sig]
+            operands = [key(input_sig) for input_sig in gate.input_signals]
+            if gate.gate_type.is_symmetric():
+                operands.sort()
+            memo[sig] = f"{gate.gate_type.name}.{index}({','.join(operands)})"
+        return memo[sig]
+
+    return tuple(key(sig) for sig in circuit.output_signals)
+
+def solutions(gates, table, input_names, output_names, max_depth=None):
+    engine = ExactCircuitSynthesis(gates, max_gates=8, verbose=False)
+    found = list(engine.iter_solutions(table, input_names, output_names, max_depth=max_depth))
+    assert all(circuit.is_functionally_correct(table) for circuit in found)
+    assert len({structure(circuit) for circuit in found}) == len(found)
+    return found
+
+def test_xor_over_nand():
+    found = solutions([NAND], truth_table(2, lambda a, b: (a ^ b,)), ['a', 'b'], ['y'])
+    assert len(found) == 1
+    assert found[0].gate_count() == 4
+
+def test_majority_over_and_or_not():
+    table = truth_table(3, lambda a, b, c: ((a & b) | (b & c) | (a & c),))
+    found = solutions([AND, OR, NOT], table, ['a', 'b', 'c'], ['y'])
+    assert len(found) == 6
+    assert {circuit.gate_count() for circuit in found} == {4}
+
+def test_full_adder_over_and_or_xor():
+    table = truth_table(3, lambda a, b, c: (a ^ b ^ c, (a & b) | (c & (a ^ b))))
+    found = solutions([AND, OR, XOR], table, ['a', 'b', 'c'], ['s', 'co'])
+    assert len(found) == 39
+    assert {circuit.gate_count() for circuit in found} == {5}
+
+    shallow = solutions([AND, OR, XOR], table, ['a', 'b', 'c'], ['s', 'co'], max_depth=3)
+    assert len(shallow) == 18
+    assert all(max(circuit.get_gates_by_level()) <= 3 for circuit in shallow)
@@ -0,0 +1,27 @@
+from conftest import random_circuit
+from gates import NOT, AND, OR, XOR, NAND, MAJ3
+from synthesis import LutMapping
+from verification import equivalent
+
+LIBRARY = [NOT, AND, OR, XOR, NAND, MAJ3]
+
+def deep_circuit(seed: int):
+    return random_circuit(seed, input_count=10, gate_count=200, output_count=6, gates=LIBRARY, locality=0.1)
+
+def test_mapping_preserves_function():
+    for seed in range(3):
+        circuit = deep_circuit(seed)
+        for lut_size in (3, 4, 6):
+            for optimize in ("depth", "area"):
+                mapped = LutMapping(lut_size, optimize=optimize, verbose=False).map(circuit)
+                assert all(len(gate.input_signals) <= lut_size for gate in mapped.gate_instances)
+                assert mapped.gate_count() <= circuit.gate_count()
+                assert equivalent(circuit, mapped)
+
+def test_depth_objective_is_not_deeper():
+    circuit = deep_circuit(7)
+    depth = LutMapping(4, optimize="depth", verbose=False).map(circuit)
+    area = LutMapping(4, optimize="area", verbose=False).map(circuit)
+    depth_levels = max(depth.get_gates_by_level())
+    area_levels = max(area.get_gates_by_level())
+    assert depth_levels <= area_levels
@@ -0,0 +1,79 @@
+import pytest
+
+from conftest import truth_table
+from core import PackedTruthTable
+from core.packed_truth_table import _projection
+
+INPUTS = [f"x{i}" for i in range(5)]
+
+def reference_projection(index: int, input_count: int) -> int:
+    return sum(1 << row for row in range(1 << input_count) if (row >> index) & 1)
+
+def test_projections_pack_words():
+    for input_count in range(1, 9):
+        for index in range(input_count):
+            assert _projection(index, input_count) == reference_projection(index, input_count)
+
+def test_constructors_agree():
+    rows = truth_table(5, lambda a, b, c, d, e: ((a & b) | (c ^ e), a ^ b ^ c ^ d ^ e))
+    mixed = reference_projection(0, 5) & reference_projection(1, 5) | \
+        (reference_projection(2, 5) ^ reference_projection(4, 5))
+    parity = 0
+    for i in range(5):
+        parity ^= reference_projection(i, 5)
+
+    expected = PackedTruthTable.from_rows(INPUTS, ["f", "g"], rows)
+    assert PackedTruthTable.from_integers(INPUTS, ["f", "g"], [mixed, parity]) == expected
+    assert PackedTruthTable.from_hex(INPUTS, ["f", "g"], expected.to_hex()) == expected
+    assert PackedTruthTable.from_vectorized(
+        INPUTS, ["f", "g"], lambda x0, x1, x2, x3, x4: ((x0 & x1) | (x2 ^ x4), x0 ^ x1 ^ x2 ^ x3 ^ x4)) == expected
+    assert PackedTruthTable.from_expressions(
+        INPUTS, ["f", "g"], ["x0 & x1 | x2 ^ x4", "x0 ^ x1 ^ x2 ^ x3 ^ x4"]) == expected
+    for input_vals, output_vals in rows:
+        assert expected.evaluate(input_vals) == output_vals
+
+def test_expressions():
+    table = PackedTruthTable.from_expressions(["a", "b"], ["f", "g", "h"], ["~(a & b)", "!a + 1", "a * 0 ^ b"])
+    assert table.to_hex() == ["7", "f", "c"]
+    with pytest.raises(ValueError):
+        PackedTruthTable.from_expressions(["a"], ["f"], ["a & c"])
+    with pytest.raises(ValueError):
+        PackedTruthTable.from_expressions(["a"], ["f"], ["(a"])
+
+def test_rows_round_trip():
+    for input_count in (1, 3, 4, 7):
+        inputs = INPUTS[:1] + [f"y{i}" for i in range(input_count - 1)]
+        rows = truth_table(input_count, lambda *values: (sum(values) % 3 == 0, values[0]))
+        table = PackedTruthTable.from_rows(inputs, ["f", "g"], rows)
+        assert table.to_rows() == rows
+        assert PackedTruthTable.from_rows(inputs, ["f", "g"], table.to_rows()) == table
+
+def test_incomplete_rows_are_rejected():
+    rows = truth_table(3, lambda a, b, c: (a & b & c,))
+    with pytest.raises(ValueError):
+        PackedTruthTable.from_rows(INPUTS[:3], ["f"], rows[:-1])
+    with pytest.raises(ValueError):
+        PackedTruthTable.from_integers(INPUTS[:3], ["f"], [0x100])
+
+def test_care_columns():
+    table = PackedTruthTable.from_integers(INPUTS[:3], ["f", "g"], [0x81, 0x0f])
+    assert not table.has_dont_cares()
+    assert table.care(0) == table.care(1) == 0xff
+
+    table.set_care(1, 0x33)
+    assert table.care(0) == 0xff and table.care(1) == 0x33
+    assert table.care_rows() == 0xff
+
+    table.set_care(0, 0x11)
+    assert table.has_dont_cares()
+    assert table.care_rows() == 0x33
+    assert [input_vals for input_vals, _ in table.to_rows()] == \
+        [(0, 0, 0), (1, 0, 0), (0, 0, 1), (1, 0, 1)]
+
+    other = PackedTruthTable.from_integers(INPUTS[:3], ["f", "g"], [0x81, 0x0f])
+    assert other != table
+    other.set_care(0, 0x11)
+    other.set_care(1, 0x33)
+    assert other == table
+    with pytest.raises(ValueError):
+        table.set_care(0, 0x100)
@@ -0,0 +1,51 @@
+from core import Circuit
+from gates import NAND
+from synthesis import CutRewriting, FunctionIndex
+from verification import equivalent
+
+def nand_xor(circuit: Circuit, a: str, b: str) -> str:
+    # A wasteful XOR: (a | b) & ~(a & b) with AND, OR and NOT spelt out in NANDs.
+    not_a = circuit.add_gate(NAND, [a, a])[0]
+    not_b = circuit.add_gate(NAND, [b, b])[0]
+    either = circuit.add_gate(NAND, [not_a, not_b])[0]
+    not_both = circuit.add_gate(NAND, [a, b])[0]
+    inverted = circuit.add_gate(NAND, [either, not_both])[0]
+    return circuit.add_gate(NAND, [inverted, inverted])[0]
+
+def ripple_adder(bits: int) -> Circuit:
+    inputs = [f"a{i}" for i in range(bits)] + [f"b{i}" for i in range(bits)]
+    outputs = [f"s{i}" for i in range(bits + 1)]
+    circuit = Circuit(inputs, outputs)
+    carry = None
+    for i in range(bits):
+        propagate = nand_xor(circuit, f"a{i}", f"b{i}")
+        generate = circuit.add_gate(NAND, [f"a{i}", f"b{i}"])[0]
+        if carry is None:
+            total = propagate
+            carry = circuit.add_gate(NAND, [generate, generate])[0]
+        else:
+            total = nand_xor(circuit, propagate, carry)
+            both = circuit.add_gate(NAND, [propagate, carry])[0]
+            carry = circuit.add_gate(NAND, [generate, both])[0]
+        inverted = circuit.add_gate(NAND, [total, total])[0]
+        circuit.add_gate(NAND, [inverted, inverted], [outputs[i]])
+    inverted = circuit.add_gate(NAND, [carry, carry])[0]
+    circuit.add_gate(NAND, [inverted, inverted], [outputs[bits]])
+    return circuit
+
+def test_rewriting_preserves_function():
+    circuit = ripple_adder(6)
+    rewritten = CutRewriting([NAND], cut_size=4, verbose=False).rewrite(circuit)
+    assert rewritten.gate_count() < circuit.gate_count()
+    assert equivalent(circuit, rewritten)
+
+    again = CutRewriting([NAND], cut_size=4, verbose=False).rewrite(rewritten)
+    assert again.gate_count() <= rewritten.gate_count()
+    assert equivalent(circuit, again)
+
+def test_rewriting_with_function_index():
+    circuit = ripple_adder(6)
+    index = FunctionIndex([NAND], 4, 5, processes=1, verbose=False).build()
+    rewritten = CutRewriting([NAND], cut_size=4, function_index=index, verbose=False).rewrite(circuit)
+    assert rewritten.gate_count() < circuit.gate_count()
+    assert equivalent(circuit, rewritten)
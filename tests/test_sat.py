@@ -0,0 +1,47 @@
+import itertools
+import random
+
+from verification import SatSolver
+
+def brute_force(variable_count, clauses, assumptions=()):
+    for bits in itertools.product((0, 1), repeat=variable_count):
+        def holds(literal):
+            return bits[abs(literal) - 1] == (literal > 0)
+        if all(holds(literal) for literal in assumptions) and all(any(holds(literal) for literal in clause)
+                                                                  for clause in clauses):
+            return True
+    return False
+
+def random_cnf(rng, variable_count, clause_count):
+    return [[rng.choice((-1, 1)) * rng.randint(1, variable_count) for _ in range(rng.randint(1, 3))]
+            for _ in range(clause_count)]
+
+def test_agrees_with_brute_force():
+    rng = random.Random(3)
+    for _ in range(300):
+        variable_count = rng.randint(3, 10)
+        clauses = random_cnf(rng, variable_count, rng.randint(1, 50))
+        solver = SatSolver()
+        for _ in range(variable_count):
+            solver.new_var()
+        for clause in clauses:
+            solver.add_clause(clause)
+
+        assumptions = [rng.choice((-1, 1)) * rng.randint(1, variable_count) for _ in range(rng.randint(0, 2))]
+        status = solver.solve(assumptions)
+        assert status == brute_force(variable_count, clauses, assumptions)
+        if status:
+            assert all(solver.value(abs(literal)) == (literal > 0) for literal in assumptions)
+            assert all(any(solver.value(abs(literal)) == (literal > 0) for literal in clause) for clause in clauses)
+        assert solver.solve() == brute_force(variable_count, clauses)
+
+def test_pigeonhole_is_unsatisfiable():
+    pigeons, holes = 6, 5
+    solver = SatSolver()
+    variables = [[solver.new_var() for _ in range(holes)] for _ in range(pigeons)]
+    for row in variables:
+        solver.add_clause(row)
+    for hole in range(holes):
+        for a, b in itertools.combinations(range(pigeons), 2):
+            solver.add_clause([-variables[a][hole], -variables[b][hole]])
+    assert solver.solve() is False
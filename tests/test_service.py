@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from conftest import rows_of, truth_table
+from gates import NOT, AND, OR, XOR, NAND
+from service import SynthesisService, SynthesisClient, create_server
+from service.protocol import gate_to_spec
+
+LIBRARY = [AND, OR, NOT]
+INPUTS = ["a", "b"]
+
+def request(function: int, priority: int = 0, max_gates: int = 6, inputs=INPUTS, outputs=("y",)) -> dict:
+    return {"inputs": list(inputs), "outputs": list(outputs),
+            "rows": [[list(i), list(o)] for i, o in rows_of(function, len(inputs))],
+            "gates": [gate_to_spec(gate) for gate in LIBRARY], "max_gates": max_gates, "priority": priority}
+
+def blocker() -> dict:
+    # A NAND-only search for a 4-input parity that cannot finish during a test.
+    parity = truth_table(4, lambda a, b, c, d: (a ^ b ^ c ^ d,))
+    return {"inputs": ["p", "q", "r", "s"], "outputs": ["y"],
+            "rows": [[list(i), list(o)] for i, o in parity],
+            "gates": [gate_to_spec(NAND)], "max_gates": 20}
+
+def wait_for(condition, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+@pytest.fixture
+def service():
+    service = SynthesisService(workers=1).start()
+    yield service
+    service.stop()
+
+def test_priority_dedup_and_cancellation(service):
+    block = service.submit(blocker())["id"]
+    wait_for(lambda: service.stats()["running"] == 1)
+
+    low = service.submit(request(0x6, priority=0))["id"]
+    high = service.submit(request(0x9, priority=5))["id"]
+    duplicate = service.submit(request(0x9, priority=1, inputs=["c", "d"], outputs=["z"]))["id"]
+    dropped = service.submit(request(0x1))["id"]
+    shared = service.submit(request(0x8))["id"]
+    kept = service.submit(request(0x8))["id"]
+    stats = service.stats()
+    assert stats["deduplicated"] == 2
+    assert stats["queued"] == 4
+
+    assert service.cancel(dropped)["status"] == "cancelled"
+    assert service.cancel(shared)["status"] == "cancelled"
+    assert service.stats()["queued"] == 3
+    assert service.status(block)["status"] == "running"
+    assert service.cancel(block)["status"] == "cancelled"
+
+    results = {job: service.status(job, wait_seconds=60) for job in (low, high, duplicate, kept)}
+    assert all(result["status"] == "done" for result in results.values())
+    assert service._jobs[high].finished_at < service._jobs[low].finished_at
+    assert results[duplicate]["result"]["inputs"] == ["c", "d"]
+    assert results[duplicate]["result"]["outputs"] == ["z"]
+    assert len(results[duplicate]["result"]["gates"]) == len(results[high]["result"]["gates"])
+    assert service.status(shared)["status"] == "cancelled"
+
+    stats = service.stats()
+    assert stats["cancelled"] == 2
+    assert stats["completed"] == 3
+    assert stats["running"] == 0 and stats["queued"] == 0 and stats["idle"] == 1
+
+def test_result_cache(service):
+    first = service.submit(request(0x6))
+    assert not first["cached"]
+    assert service.status(first["id"], wait_seconds=60)["status"] == "done"
+
+    again = service.submit(request(0x6, inputs=["u", "v"]))
+    assert again["cached"] and again["status"] == "done"
+    assert again["result"]["inputs"] == ["u", "v"]
+    # A minimum circuit also proves that fewer gates cannot work.
+    assert service.submit(request(0x6, max_gates=3))["result"] is None
+
+    miss = service.submit(request(0x9, max_gates=2))
+    assert service.status(miss["id"], wait_seconds=60)["result"] is None
+    assert service.submit(request(0x9, max_gates=1))["cached"]
+    deeper = service.submit(request(0x9, max_gates=4))
+    assert not deeper["cached"]
+    assert len(service.status(deeper["id"], wait_seconds=60)["result"]["gates"]) == 4
+    assert service.submit(request(0x9, max_gates=3))["cached"]
+
+    stats = service.stats()
+    assert stats["cache_hits"] == 4
+    assert stats["cached"] == 2
+
+def test_http_client(service):
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = SynthesisClient(port=server.server_address[1], timeout=30)
+        rows = truth_table(3, lambda a, b, c: (a ^ b ^ c, int(a + b + c >= 2)))
+        circuit = client.synthesize(rows, ["a", "b", "c"], ["s", "co"], [XOR, AND, OR], max_gates=6, timeout=60)
+        assert circuit.is_functionally_correct(rows)
+        assert circuit.gate_count() == 5
+
+        block = blocker()
+        job = client.submit(rows_of(0x6996, 4), block["inputs"], block["outputs"], [NAND], max_gates=20)
+        wait_for(lambda: client.stats()["running"] == 1)
+        queued = client.submit(rows_of(0x7, 2), INPUTS, ["y"], LIBRARY, priority=3)
+        assert client.stats()["queued"] == 1
+        assert client.cancel(job)["status"] == "cancelled"
+        assert client.result(job) is None
+        assert client.result(queued, timeout=60).is_functionally_correct(rows_of(0x7, 2))
+        assert client.status(queued)["priority"] == 3
+
+        cached = client.submit(rows, ["a", "b", "c"], ["s", "co"], [XOR, AND, OR], max_gates=6)
+        assert client.status(cached)["cached"]
+        stats = client.stats()
+        assert stats["cache_hits"] == 1 and stats["cancelled"] == 1 and stats["completed"] == 2
+
+        with pytest.raises(KeyError):
+            client.status("missing")
+        with pytest.raises(ValueError):
+            client.submit(rows_of(0x7, 2), INPUTS, ["y"], LIBRARY, max_gates="many")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,23 @@
+from core import TruthTable
+from gates import AND, OR, XOR, NAND
+from synthesis import StochasticCircuitSynthesis
+
+NAMES = [f"x{i}" for i in range(5)]
+TABLE = TruthTable.from_function(NAMES, ['p', 't'], lambda **values: [sum(values.values()) % 2,
+                                                                    int(sum(values.values()) >= 3)])
+
+def test_seed_circuits_are_correct():
+    # Without any generations the result is the constructed seed itself.
+    for gates in ([NAND], [AND, OR, XOR]):
+        engine = StochasticCircuitSynthesis(gates, restarts=1, max_generations=0, seed=1, verbose=False)
+        circuit = engine.synthesize(TABLE, NAMES, ['p', 't'])
+        assert circuit is not None
+        assert circuit.is_functionally_correct(TABLE)
+
+def test_evolution_shrinks_the_seed():
+    seed_only = StochasticCircuitSynthesis([AND, OR, XOR], restarts=1, max_generations=0, seed=1, verbose=False)
+    evolved = StochasticCircuitSynthesis([AND, OR, XOR], restarts=1, max_generations=3000, seed=1, verbose=False)
+    start = seed_only.synthesize(TABLE, NAMES, ['p', 't'])
+    result = evolved.synthesize(TABLE, NAMES, ['p', 't'])
+    assert result.is_functionally_correct(TABLE)
+    assert result.gate_count() < start.gate_count()
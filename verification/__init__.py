@@ -0,0 +1,8 @@
+from .sat import SatSolver
+from .equivalence import EquivalenceResult, equivalent
+
+__all__ = [
+    "SatSolver",
+    "EquivalenceResult",
+    "equivalent"
+]
@@ -0,0 +1,215 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import random
+
+from core import Circuit
+from gates import gate_function
+from .sat import SatSolver
+
+EXHAUSTIVE_INPUT_LIMIT = 16
+
+@dataclass
+class EquivalenceResult:
+    equivalent: Optional[bool]
+    counterexample: Optional[Tuple[int, ...]] = None
+    mismatched_outputs: List[str] = field(default_factory=list)
+    proven_internal_points: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.equivalent)
+
+def equivalent(circuit_a: Circuit,
+               circuit_b: Circuit,
+               simulation_words: int = 4,
+               word_size: int = 64,
+               seed: int = 0,
+               internal_conflict_limit: int = 200,
+               conflict_limit: Optional[int] = None) -> EquivalenceResult:
+    if set(circuit_a.input_signals) != set(circuit_b.input_signals):
+        raise ValueError("Circuits must have the same input signals")
+    if len(circuit_a.output_signals) != len(circuit_b.output_signals):
+        raise ValueError("Circuits must have the same number of outputs")
+
+    input_names = circuit_a.input_signals
+    output_pairs = _match_outputs(circuit_a, circuit_b)
+
+    if len(input_names) <= EXHAUSTIVE_INPUT_LIMIT:
+        width = 1 << len(input_names)
+        patterns = [_exhaustive_pattern(i, len(input_names)) for i in range(len(input_names))]
+    else:
+        rng = random.Random(seed)
+        width = simulation_words * word_size
+        patterns = [rng.getrandbits(width) for _ in input_names]
+
+    miter = _Miter(circuit_a, circuit_b, input_names, patterns, width)
+    mismatch = miter.simulation_mismatch(output_pairs)
+    if mismatch is not None:
+        return mismatch
+    if len(input_names) <= EXHAUSTIVE_INPUT_LIMIT:
+        return EquivalenceResult(True)
+
+    miter.encode()
+    miter.merge_internal_points(internal_conflict_limit)
+
+    undecided = False
+    for out_a, out_b in output_pairs:
+        status = miter.prove_equal(miter.a_signal(out_a), miter.b_signal(out_b), conflict_limit)
+        if status is None:
+            undecided = True
+        elif not status:
+            return miter.counterexample_result(output_pairs)
+
+    return EquivalenceResult(None if undecided else True, proven_internal_points=miter.proven_points)
+
+def _match_outputs(circuit_a: Circuit, circuit_b: Circuit) -> List[Tuple[str, str]]:
+    if set(circuit_a.output_signals) == set(circuit_b.output_signals):
+        return [(sig, sig) for sig in circuit_a.output_signals]
+    return list(zip(circuit_a.output_signals, circuit_b.output_signals))
+
+def _exhaustive_pattern(index: int, input_count: int) -> int:
+    return sum(1 << row for row in range(1 << input_count) if (row >> index) & 1)
+
+class _Miter:
+    def __init__(self, circuit_a: Circuit, circuit_b: Circuit, input_names: List[str],
+                 patterns: List[int], width: int):
+        self.circuit_a = circuit_a
+        self.circuit_b = circuit_b
+        self.input_names = input_names
+        self.mask = (1 << width) - 1
+        self.width = width
+        self.patterns = dict(zip(input_names, patterns))
+        self.values_a = circuit_a.simulate_bits([self.patterns[sig] for sig in circuit_a.input_signals], self.mask)
+        self.values_b = circuit_b.simulate_bits([self.patterns[sig] for sig in circuit_b.input_signals], self.mask)
+        for circuit, values in ((circuit_a, self.values_a), (circuit_b, self.values_b)):
+            for sig in circuit.output_signals:
+                if sig not in values:
+                    raise ValueError(f"Output {sig} is not driven")
+        self.solver = SatSolver()
+        self.variables: Dict[str, int] = {}
+        self.proven_points = 0
+
+    def a_signal(self, sig: str) -> str:
+        return sig if sig in self.patterns else f"a:{sig}"
+
+    def b_signal(self, sig: str) -> str:
+        return sig if sig in self.patterns else f"b:{sig}"
+
+    def simulation_mismatch(self, output_pairs: List[Tuple[str, str]]) -> Optional[EquivalenceResult]:
+        difference = 0
+        for out_a, out_b in output_pairs:
+            difference |= self.values_a[out_a] ^ self.values_b[out_b]
+        if not difference:
+            return None
+
+        bit = (difference & -difference).bit_length() - 1
+        counterexample = {sig: (pattern >> bit) & 1 for sig, pattern in self.patterns.items()}
+        return self._result_for(counterexample, output_pairs)
+
+    def counterexample_result(self, output_pairs: List[Tuple[str, str]]) -> EquivalenceResult:
+        counterexample = {sig: self.solver.value(self.variables[sig]) for sig in self.input_names}
+        return self._result_for(counterexample, output_pairs)
+
+    def _result_for(self, assignment: Dict[str, int], output_pairs: List[Tuple[str, str]]) -> EquivalenceResult:
+        vector = tuple(assignment[sig] for sig in self.input_names)
+        point_a = self.circuit_a.simulate_bits([assignment[sig] for sig in self.circuit_a.input_signals], 1)
+        point_b = self.circuit_b.simulate_bits([assignment[sig] for sig in self.circuit_b.input_signals], 1)
+        mismatched = [out_a for out_a, out_b in output_pairs if point_a[out_a] != point_b[out_b]]
+        return EquivalenceResult(False, vector, mismatched)
+
+    def _variable(self, name: str) -> int:
+        var = self.variables.get(name)
+        if var is None:
+            var = self.solver.new_var()
+            self.variables[name] = var
+        return var
+
+    def encode(self) -> None:
+        for sig in self.input_names:
+            self._variable(sig)
+        self._encode_circuit(self.circuit_a, self.a_signal)
+        self._encode_circuit(self.circuit_b, self.b_signal)
+
+    def _encode_circuit(self, circuit: Circuit, rename) -> None:
+        functions: Dict[Tuple[str, int], int] = {}
+        for gate in circuit.gate_instances:
+            gate_type = gate.gate_type
+            inputs = [self._variable(rename(sig)) for sig in gate.input_signals]
+            for index, output_sig in enumerate(gate.output_signals):
+                key = (gate_type.name, index)
+                if key not in functions:
+                    functions[key] = gate_function(gate_type, index)
+                function = functions[key]
+                output = self._variable(rename(output_sig))
+                for row in range(1 << gate_type.input_count):
+                    clause = [-var if (row >> i) & 1 else var for i, var in enumerate(inputs)]
+                    clause.append(output if (function >> row) & 1 else -output)
+                    self.solver.add_clause(clause)
+
+    def merge_internal_points(self, conflict_limit: int) -> None:
+        # Signals of B whose simulation signature matches a signal of A are
+        # proven equal bottom-up; each proof adds clauses that shortcut the
+        # cones feeding the outputs.
+        candidates = self._signature_index()
+        for sig in self._ordered_signals(self.circuit_b):
+            if sig in self.patterns:
+                continue
+            value = self.values_b[sig]
+            match = candidates.get(min(value, value ^ self.mask))
+            if match is None:
+                continue
+            partner, inverted = match[0], (self.values_a[match[0]] != value)
+            status = self.prove_equal(self.a_signal(partner), self.b_signal(sig), conflict_limit, inverted)
+            if status:
+                a_var = self.variables[self.a_signal(partner)]
+                b_var = self.variables[self.b_signal(sig)]
+                if inverted:
+                    b_var = -b_var
+                self.solver.add_clause([-a_var, b_var])
+                self.solver.add_clause([a_var, -b_var])
+                self.proven_points += 1
+            elif status is False:
+                self._refine(self.counterexample_pattern())
+                candidates = self._signature_index()
+
+    def _signature_index(self) -> Dict[int, List[str]]:
+        index: Dict[int, List[str]] = {}
+        for sig, value in self.values_a.items():
+            if sig in self.patterns:
+                continue
+            index.setdefault(min(value, value ^ self.mask), []).append(sig)
+        return index
+
+    @staticmethod
+    def _ordered_signals(circuit: Circuit) -> List[str]:
+        levels = circuit.get_gates_by_level()
+        return [sig for level in sorted(levels.keys()) for gate in levels[level] for sig in gate.output_signals]
+
+    def prove_equal(self, sig_a: str, sig_b: str, conflict_limit: Optional[int], inverted: bool = False) -> Optional[bool]:
+        a_var = self.variables[sig_a]
+        b_var = self.variables[sig_b]
+        if inverted:
+            b_var = -b_var
+
+        undecided = False
+        for assumptions in ([a_var, -b_var], [-a_var, b_var]):
+            status = self.solver.solve(assumptions, conflict_limit)
+            if status:
+                return False
+            if status is None:
+                undecided = True
+        return None if undecided else True
+
+    def counterexample_pattern(self) -> Dict[str, int]:
+        return {sig: self.solver.value(self.variables[sig]) for sig in self.input_names}
+
+    def _refine(self, assignment: Dict[str, int]) -> None:
+        self.width += 1
+        self.mask = (self.mask << 1) | 1
+        for sig in self.input_names:
+            self.patterns[sig] = (self.patterns[sig] << 1) | assignment[sig]
+        point_a = self.circuit_a.simulate_bits([assignment[sig] for sig in self.circuit_a.input_signals], 1)
+        point_b = self.circuit_b.simulate_bits([assignment[sig] for sig in self.circuit_b.input_signals], 1)
+        for sig, bit in point_a.items():
+            self.values_a[sig] = (self.values_a[sig] << 1) | bit
+        for sig, bit in point_b.items():
+            self.values_b[sig] = (self.values_b[sig] << 1) | bit
@@ -0,0 +1,293 @@
+from typing import Iterable, List, Optional, Sequence
+import heapq
+
+class SatSolver:
+    def __init__(self):
+        self.ok = True
+        self.clauses: List[List[int]] = []
+        self.watches: List[List[int]] = []
+        self.assigns: List[int] = []
+        self.levels: List[int] = []
+        self.reasons: List[int] = []
+        self.activity: List[float] = []
+        self.polarity: List[int] = []
+        self.trail: List[int] = []
+        self.trail_limits: List[int] = []
+        self.queue_head = 0
+        self.order_heap: List = []
+        self.var_increment = 1.0
+        self.model: List[int] = []
+        self.conflicts = 0
+
+    def new_var(self) -> int:
+        self.watches.append([])
+        self.watches.append([])
+        self.assigns.append(-1)
+        self.levels.append(0)
+        self.reasons.append(-1)
+        self.activity.append(0.0)
+        self.polarity.append(1)
+        var = len(self.assigns) - 1
+        heapq.heappush(self.order_heap, (0.0, var))
+        return var + 1
+
+    @property
+    def num_vars(self) -> int:
+        return len(self.assigns)
+
+    def add_clause(self, literals: Iterable[int]) -> bool:
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+
+        clause = []
+        seen = set()
+        for literal in literals:
+            lit = self._encode(literal)
+            if lit ^ 1 in seen:
+                return True
+            if lit in seen:
+                continue
+            value = self._value(lit)
+            if value == 1:
+                return True
+            if value == 0:
+                continue
+            seen.add(lit)
+            clause.append(lit)
+
+        if not clause:
+            self.ok = False
+            return False
+        if len(clause) == 1:
+            self._enqueue(clause[0], -1)
+            if self._propagate() >= 0:
+                self.ok = False
+            return self.ok
+
+        self._attach(clause)
+        return True
+
+    def solve(self, assumptions: Sequence[int] = (), conflict_limit: Optional[int] = None) -> Optional[bool]:
+        self.model = []
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        if self._propagate() >= 0:
+            self.ok = False
+            return False
+
+        assumed = [self._encode(literal) for literal in assumptions]
+        limit = None if conflict_limit is None else self.conflicts + conflict_limit
+        restart = 0
+        while True:
+            status = self._search(assumed, 100 * _luby(restart), limit)
+            if status is not None or (limit is not None and self.conflicts >= limit):
+                break
+            restart += 1
+
+        if status:
+            self.model = [value if value >= 0 else 0 for value in self.assigns]
+        self._cancel_until(0)
+        return status
+
+    def value(self, var: int) -> int:
+        return self.model[var - 1]
+
+    def _search(self, assumed: List[int], restart_limit: int, limit: Optional[int]) -> Optional[bool]:
+        local_conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict >= 0:
+                self.conflicts += 1
+                local_conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learnt, backtrack_level = self._analyze(conflict)
+                self._cancel_until(backtrack_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], -1)
+                else:
+                    self._enqueue(learnt[0], self._attach(learnt))
+                self.var_increment *= 1.05
+                if self.var_increment > 1e100:
+                    self._rescale_activity()
+                continue
+
+            if local_conflicts >= restart_limit or (limit is not None and self.conflicts >= limit):
+                self._cancel_until(0)
+                return None
+
+            next_lit = -1
+            while len(self.trail_limits) < len(assumed):
+                lit = assumed[len(self.trail_limits)]
+                value = self._value(lit)
+                if value == 1:
+                    self.trail_limits.append(len(self.trail))
+                elif value == 0:
+                    return False
+                else:
+                    next_lit = lit
+                    break
+
+            if next_lit < 0:
+                next_lit = self._pick_branch_literal()
+                if next_lit < 0:
+                    return True
+
+            self.trail_limits.append(len(self.trail))
+            self._enqueue(next_lit, -1)
+
+    def _encode(self, literal: int) -> int:
+        var = abs(literal) - 1
+        while var >= len(self.assigns):
+            self.new_var()
+        return 2 * var + (literal < 0)
+
+    def _value(self, lit: int) -> int:
+        value = self.assigns[lit >> 1]
+        return value if value < 0 else value ^ (lit & 1)
+
+    def _enqueue(self, lit: int, reason: int) -> None:
+        var = lit >> 1
+        self.assigns[var] = 1 - (lit & 1)
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def _attach(self, clause: List[int]) -> int:
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def _propagate(self) -> int:
+        trail = self.trail
+        clauses = self.clauses
+        watches = self.watches
+        assigns = self.assigns
+
+        while self.queue_head < len(trail):
+            false_lit = trail[self.queue_head] ^ 1
+            self.queue_head += 1
+            watching = watches[false_lit]
+            kept = []
+            position = 0
+            count = len(watching)
+
+            while position < count:
+                index = watching[position]
+                position += 1
+                clause = clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+
+                first = clause[0]
+                first_value = assigns[first >> 1]
+                if first_value >= 0 and first_value ^ (first & 1) == 1:
+                    kept.append(index)
+                    continue
+
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    value = assigns[lit >> 1]
+                    if value < 0 or value ^ (lit & 1) == 1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value >= 0:
+                        kept.extend(watching[position:])
+                        watches[false_lit] = kept
+                        self.queue_head = len(trail)
+                        return index
+                    self._enqueue(first, index)
+
+            watches[false_lit] = kept
+        return -1
+
+    def _analyze(self, conflict: int):
+        seen = set()
+        learnt = [0]
+        counter = 0
+        current_level = len(self.trail_limits)
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        start = 0
+
+        while True:
+            for lit in clause[start:]:
+                var = lit >> 1
+                if var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self._bump(var)
+                if self.levels[var] == current_level:
+                    counter += 1
+                else:
+                    learnt.append(lit)
+
+            while (self.trail[index] >> 1) not in seen:
+                index -= 1
+            pivot = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reasons[pivot >> 1]]
+            start = 1
+
+        learnt[0] = pivot ^ 1
+        if len(learnt) == 1:
+            return learnt, 0
+
+        best = max(range(1, len(learnt)), key=lambda i: self.levels[learnt[i] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.levels[learnt[1] >> 1]
+
+    def _cancel_until(self, level: int) -> None:
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for lit in self.trail[limit:]:
+            var = lit >> 1
+            self.polarity[var] = lit & 1
+            self.assigns[var] = -1
+            self.reasons[var] = -1
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.queue_head = len(self.trail)
+
+    def _pick_branch_literal(self) -> int:
+        heap = self.order_heap
+        while heap:
+            _, var = heapq.heappop(heap)
+            if self.assigns[var] < 0:
+                return 2 * var + self.polarity[var]
+        return -1
+
+    def _bump(self, var: int) -> None:
+        self.activity[var] += self.var_increment
+        if self.assigns[var] < 0:
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+
+    def _rescale_activity(self) -> None:
+        self.activity = [a * 1e-100 for a in self.activity]
+        self.var_increment *= 1e-100
+        self.order_heap = [(-self.activity[var], var) for var in range(len(self.assigns)) if self.assigns[var] < 0]
+        heapq.heapify(self.order_heap)
+
+def _luby(index: int) -> int:
+    size, sequence = 1, 0
+    while size < index + 1:
+        sequence += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        sequence -= 1
+        index %= size
+    return 1 << sequence